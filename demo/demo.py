@@ -25,8 +25,8 @@ if os.path.exists(os.path.join(os.path.dirname(DEMO_PATH), "sappho")):
     sys.path.insert(0, os.path.dirname(DEMO_PATH))
 
 from sappho import collide
-from sappho.layers import SurfaceLayers
-from sappho.camera import Camera, CameraCenterBehavior
+from sappho.layers import SurfaceLayers, ParallaxLayer, OPAQUE
+from sappho.camera import Camera, CameraSmoothBehavior
 from sappho.animate import AnimatedSprite
 from sappho.tiles import TileMap, Tilesheet, tmx_file_to_tilemaps
 
@@ -88,8 +88,6 @@ class Player(object):
             closest_position, collided_with = collide.move_as_close_as_possible(self.sprite, new_coord, wall_collision_group)
             self.sprite.rect.topleft = closest_position
 
-        camera.scroll_to(self.sprite.rect)
-
         if collided_with:
             THIP_SOUND.play()
             self.bullet_duration = 500
@@ -261,9 +259,9 @@ clock = pygame.time.Clock()
 # Hide the mouse cursor
 pygame.mouse.set_visible(0)
  
-# a background animation
-# will be paralax
+# a background animation, scrolling at half the speed of the map
 animated_bg = AnimatedSprite.from_gif("bg.gif")
+background = ParallaxLayer(animated_bg.image, 0.5)
 
 # The sprite which the player controls
 player = Player(config.START_POSITION)
@@ -282,10 +280,27 @@ for tilemap_representing_layer in tilemaps_by_layer:
 # Set up the camera
 surface_size = tilemap_surfaces[0].get_size()
 camera = Camera(surface_size, config.RESOLUTION, config.VIEWPORT,
-                behavior=CameraCenterBehavior())
-
-# The render layers which we draw to
-layers = SurfaceLayers(camera.source_surface, len(tilemap_surfaces))
+                behavior=CameraSmoothBehavior(smooth_time=120,
+                                              deadzone=(16, 16),
+                                              look_ahead=100),
+                integer_scaling=True)
+
+# The render layers which we draw to: the background, then each
+# tilemap layer, with the sprites on their own layer above the
+# tilemap layer they're on. The tilemap layers never change, so
+# they're static; only drawn when the layers move (see below),
+# rather than every frame. The layers only cover the camera's
+# view, plus a margin, rather than the whole map.
+SPRITE_LAYER_INDEX = config.ANIMATED_SPRITE_Z_INDEX + 2
+TILEMAP_LAYER_INDEXES = [i + 1 if i < SPRITE_LAYER_INDEX - 1 else i + 2
+                         for i in range(len(tilemap_surfaces))]
+layers = SurfaceLayers(camera.source_surface, len(tilemap_surfaces) + 2,
+                       static_layers=TILEMAP_LAYER_INDEXES,
+                       viewport_size=config.VIEWPORT,
+                       margin=config.VIEWPORT[0])
+
+# The background covers the whole view, so it doesn't need alpha
+layers.set_mode(0, OPAQUE)
 
 # Asteroids
 asteroid_list = pygame.sprite.Group()
@@ -331,7 +346,10 @@ while not done:
     tilemap_on_players_index = tilemaps_by_layer[config.ANIMATED_SPRITE_Z_INDEX]
     collision_group_on_player_index = tilemap_on_players_index.collision_group
     timedelta = clock.get_time()
-    player.update(camera, collision_group_on_player_index, layers[0].get_size(), timedelta)
+    player.update(camera, collision_group_on_player_index, surface_size, timedelta)
+
+    # Follow the player, every frame, so the camera eases to a stop
+    camera.scroll_to(player.sprite.rect, timedelta)
  
     # create some asteroids, hurdled t the player
     # we should make these chase the player, actually...
@@ -339,30 +357,35 @@ while not done:
 
     # DRAWING/RENDER CODE
 
-    # first let's render each tilemap on its respective surface
-    for i, tilemap_layer in enumerate(tilemap_surfaces):
-        layers[i].blit(animated_bg.image, camera.view_rect.topleft)
-        layers[i].blit(tilemap_layer, (0, 0))
+    # The layers have moved to keep up with the camera, so the
+    # static tilemap layers have to be drawn again.
+    if layers.set_view(camera.view_rect):
+
+        for layer_index, tilemap_layer in zip(TILEMAP_LAYER_INDEXES,
+                                              tilemap_surfaces):
+            layers[layer_index].blit(tilemap_layer, (0, 0))
 
+    # first the background, behind the (static) tilemap layers
+    background.image = animated_bg.image
+    background.draw(layers[0], camera.view_rect)
 
     # Finally let's render the animated sprite on some
     # arbitrary layer. In the future the TMX will set this.
-    layers[config.ANIMATED_SPRITE_Z_INDEX].blit(player.sprite.image,
-                                                player.sprite.rect.topleft)
+    layers[SPRITE_LAYER_INDEX].blit(player.sprite.image,
+                                    player.sprite.rect.topleft)
 
-    # draw asteroids
-    asteroid_list.draw(layers[config.ANIMATED_SPRITE_Z_INDEX])
-    # draw bullets
-    player.bullet_list.draw(layers[config.ANIMATED_SPRITE_Z_INDEX])
+    # draw the asteroids and bullets which are on screen
+    camera.draw_group(asteroid_list, layers[SPRITE_LAYER_INDEX])
+    camera.draw_group(player.bullet_list, layers[SPRITE_LAYER_INDEX])
 
     # ... Draw those layers!
-    layers.render()
+    updated_rects = layers.render()
      
     # Let's get the timedelta and then send it to the appropriate things...
-    camera.update_state("hahahahahah lies lies lies")
+    camera.update_state(timedelta, source_changed=bool(updated_rects))
     animated_bg.update(timedelta)
     player.bullet_list.update(collision_group_on_player_index, asteroid_list, player.bullet_list, timedelta)
-    asteroid_list.update(collision_group_on_player_index, layers[0].get_size(), asteroid_list, player.bullet_list, timedelta)
+    asteroid_list.update(collision_group_on_player_index, surface_size, asteroid_list, player.bullet_list, timedelta)
  
     # Go ahead and update the screen with what we've drawn.
     screen.blit(camera, (0, 0))
@@ -45,7 +45,7 @@ class CameraBehavior(object):
     """
 
     @staticmethod
-    def move(camera, focal_rectangle):
+    def move(camera, focal_rectangle, timedelta=None):
         """Move the camera, keeping the focal rectangle in
         the top left of the camera view.
 
@@ -56,6 +56,10 @@ class CameraBehavior(object):
                 Sappho camera object to control.
             focal_rectangle (pygame.Rect): Rectangle which
                 is used to possibly adjust camera position.
+            timedelta (int|None): Milliseconds since the camera
+                last moved, if given to
+                :meth:`Camera.scroll_to`. Only used by
+                behaviors which move over time.
 
         """
 
@@ -74,7 +78,7 @@ class CameraCenterBehavior(CameraBehavior):
     """
 
     @staticmethod
-    def move(camera, focal_rectangle):
+    def move(camera, focal_rectangle, timedelta=None):
         """Move the camera, keeping the focal rectangle
         in the center of the screen where possible.
 
@@ -82,28 +86,211 @@ class CameraCenterBehavior(CameraBehavior):
             camera (sappho.camera.Camera):
             focal_rectangle (pygame.Rect): Rectangle which
                 is used to possibly adjust camera position.
+            timedelta (int|None): Not used.
 
         """
 
-        new_view_rect = camera.view_rect.copy()
-        new_view_rect.center = focal_rectangle.center
+        view_rect = camera.view_rect
+
+        # Same as setting view_rect.center, without copying the rect
+        left = focal_rectangle.centerx - view_rect.width // 2
+        top = focal_rectangle.centery - view_rect.height // 2
 
         # Make sure the camera isn't centered in a way that
         # exceeds the environment's dimensions (don't go off
         # the map!)
-        if new_view_rect.left < 0:
-            new_view_rect.left = 0
+        view_rect.topleft = clamp_view_position(camera, left, top)
+
+
+class CameraSmoothBehavior(CameraBehavior):
+    """A camera behavior which follows the focal rectangle
+    smoothly over time, rather than snapping to it.
+
+    The view is pulled towards centering the focal rectangle by
+    a critically damped spring, so it eases in and out without
+    overshooting. The focal rectangle can move freely within a
+    deadzone in the middle of the view without the camera moving,
+    and the camera can look ahead of where the focal rectangle
+    is heading.
+
+    The camera's position is kept as floats, and only rounded
+    for the view rect, so slow movement isn't jittery.
+
+    Like :class:`CameraCenterBehavior`, the view is kept within
+    the source resolution.
+
+    The behavior keeps track of the camera's position and velocity,
+    so each camera needs its own instance.
+
+    Arguments:
+        smooth_time (float): Roughly how many milliseconds the
+            camera takes to catch up with the focal rectangle.
+            0 snaps to it.
+        deadzone (tuple[int, int]): Size of the area in the middle
+            of the view the focal rectangle's center can move
+            around in without moving the camera.
+        look_ahead (float): How many milliseconds of the focal
+            rectangle's current velocity to look ahead by.
+
+    Attributes:
+        smooth_time (float): --
+        deadzone (tuple[int, int]): --
+        look_ahead (float): --
+        position (tuple[float, float]|None): The position of the
+            view's topleft, before rounding, or None until the
+            first move.
+
+    """
+
+    def __init__(self, smooth_time=150.0, deadzone=(0, 0), look_ahead=0.0):
+        self.smooth_time = smooth_time
+        self.deadzone = deadzone
+        self.look_ahead = look_ahead
+        self.position = None
+        self._velocity = (0.0, 0.0)
+        self._focal_position = None
+        self._focal_velocity = (0.0, 0.0)
+
+    def move(self, camera, focal_rectangle, timedelta=None):
+        """Move the camera towards the focal rectangle, by as far
+        as it would have in timedelta milliseconds.
+
+        Arguments:
+            camera (sappho.camera.Camera):
+            focal_rectangle (pygame.Rect): Rectangle which
+                is used to possibly adjust camera position.
+            timedelta (int|None): Milliseconds since the last
+                move. If None, the camera snaps to its target.
+
+        """
+
+        view_width, view_height = camera.view_rect.size
+        focal_x, focal_y = focal_rectangle.center
+
+        if timedelta and self._focal_position is not None:
+            self._focal_velocity = (
+                (focal_x - self._focal_position[0]) / float(timedelta),
+                (focal_y - self._focal_position[1]) / float(timedelta),
+            )
+
+        self._focal_position = (focal_x, focal_y)
+
+        # Where the view's center would ideally be
+        target_x = focal_x + self._focal_velocity[0] * self.look_ahead
+        target_y = focal_y + self._focal_velocity[1] * self.look_ahead
+
+        if self.position is None or timedelta is None:
+            x = target_x - view_width / 2.0
+            y = target_y - view_height / 2.0
+            self._velocity = (0.0, 0.0)
+        else:
+            x, velocity_x = self._follow(self.position[0], view_width,
+                                         target_x, self.deadzone[0],
+                                         self._velocity[0], timedelta)
+            y, velocity_y = self._follow(self.position[1], view_height,
+                                         target_y, self.deadzone[1],
+                                         self._velocity[1], timedelta)
+            self._velocity = (velocity_x, velocity_y)
+
+        clamped_x, clamped_y = clamp_view_position(camera, x, y)
+
+        # Don't keep pushing against the edge of the map
+        if clamped_x != x:
+            self._velocity = (0.0, self._velocity[1])
+
+        if clamped_y != y:
+            self._velocity = (self._velocity[0], 0.0)
+
+        self.position = (clamped_x, clamped_y)
+        camera.view_rect.topleft = (int(round(clamped_x)),
+                                    int(round(clamped_y)))
+
+    def _follow(self, position, view_length, target, deadzone, velocity,
+                timedelta):
+        """Move one axis of the view's position towards centering
+        on the target, unless the target is within the deadzone.
+
+        Returns:
+            tuple[float, float]: The new position and velocity.
+
+        """
+
+        center = position + view_length / 2.0
+        half_deadzone = deadzone / 2.0
+
+        # Only follow the target as far as the edge of the deadzone
+        if target > center + half_deadzone:
+            target -= half_deadzone
+        elif target < center - half_deadzone:
+            target += half_deadzone
+        else:
+            target = center
+
+        target -= view_length / 2.0
+
+        if not self.smooth_time:
+
+            return target, 0.0
+
+        return smooth_damp(position, target, velocity, self.smooth_time,
+                           timedelta)
+
+
+def clamp_view_position(camera, left, top):
+    """Constrain the position of a camera's view so that the view
+    stays within the source resolution (where possible).
+
+    Arguments:
+        camera (Camera): --
+        left (float): The position of the view's left edge.
+        top (float): The position of the view's top edge.
+
+    Returns:
+        tuple[float, float]: The constrained left and top.
+
+    """
+
+    source_width, source_height = camera.source_resolution
+    view_width, view_height = camera.view_rect.size
+    left = min(max(left, 0), source_width - view_width)
+    top = min(max(top, 0), source_height - view_height)
 
-        if new_view_rect.top < 0:
-            new_view_rect.top = 0
+    return left, top
 
-        if new_view_rect.bottom > camera.source_resolution[1]:
-            new_view_rect.bottom = camera.source_resolution[1]
 
-        if new_view_rect.right > camera.source_resolution[0]:
-            new_view_rect.right = camera.source_resolution[0]
+def smooth_damp(position, target, velocity, smooth_time, timedelta):
+    """Move a position towards a target like a critically damped
+    spring, which eases in and out without overshooting.
 
-        camera.view_rect = new_view_rect
+    Arguments:
+        position (float): --
+        target (float): --
+        velocity (float): The position's velocity, per millisecond.
+        smooth_time (float): Roughly how many milliseconds it takes
+            to reach the target.
+        timedelta (float): Milliseconds to move for.
+
+    Returns:
+        tuple[float, float]: The new position and velocity.
+
+    Example:
+        >>> position, velocity = smooth_damp(0.0, 100.0, 0.0, 100.0, 16)
+        >>> 0 < position < 100 and velocity > 0
+        True
+
+    """
+
+    omega = 2.0 / smooth_time
+    x = omega * timedelta
+
+    # An approximation of exp(-x), which is exact enough
+    decay = 1.0 / (1.0 + x + 0.48 * x * x + 0.235 * x * x * x)
+    change = position - target
+    temp = (velocity + omega * change) * timedelta
+    velocity = (velocity - omega * temp) * decay
+    position = target + (change + temp) * decay
+
+    return position, velocity
 
 
 class Camera(pygame.surface.Surface):
@@ -124,30 +311,214 @@ class Camera(pygame.surface.Surface):
         behavior (CameraBehavior): The initial behavior to use for this
             Camera. The :py:class:`CameraBehavior <sappho.CameraBehavior>`
             that this Camera uses to control movement.
+        integer_scaling (bool): Scale the view by the largest whole
+            number factor that fits the output resolution, centered
+            with black borders (letterboxing), rather than stretching
+            it to fill the output. Pixels stay crisp and square, and
+            scaling is faster. Transparent areas of the view are
+            drawn black.
+        source_surface (pygame.Surface): The surface viewed; the
+            size of the source resolution, or, with a view-sized
+            source, the size of the view.
+        view_sized_source (bool): Whether the source surface only
+            covers the view, rather than the entire environment.
+            Everything has to be drawn to it relative to the view,
+            see :meth:`world_to_screen`, and typically only if it's
+            in view, see :meth:`in_view`. This makes drawing cost
+            depend on what's on screen, rather than the size of the
+            environment.
 
     """
 
     def __init__(self, source_resolution, output_resolution,
-                 view_resolution, behavior=None):
+                 view_resolution, behavior=None, integer_scaling=False,
+                 view_sized_source=False, source_surface=None):
 
         """Create a Camera!
 
         Arguments:
             view_resolution (tuple[int, int]): used to create
                 view_rect attribute.
+            integer_scaling (bool): See the integer_scaling attribute.
+            view_sized_source (bool): See the view_sized_source
+                attribute.
+            source_surface (pygame.Surface|None): An existing surface
+                to view, e.g., one shared with other cameras, rather
+                than creating one.
 
         """
 
         super(Camera, self).__init__(output_resolution)
 
-        self.source_surface = pygame.surface.Surface(source_resolution,
-                                                     pygame.SRCALPHA)
+        self.view_sized_source = view_sized_source
+
+        if source_surface is None:
+            source_surface = pygame.surface.Surface(
+                view_resolution if view_sized_source else source_resolution,
+                pygame.SRCALPHA
+            )
+
+        self.source_surface = source_surface
         self.source_resolution = source_resolution
         self.output_resolution = output_resolution
         self.view_rect = pygame.Rect((0, 0), view_resolution)
         self.behavior = behavior or CameraBehavior()
+        self.integer_scaling = integer_scaling
+
+        # The view rendered by the last update_state(), and the
+        # surface the view is scaled into (created when first needed)
+        self._rendered_view_rect = None
+        self._scaled_surface = None
+
+        # For integer scaling: the view size the buffers below are
+        # for, a buffer of the view in this camera's pixel format,
+        # and the area of this camera the view is scaled into.
+        self._integer_view_size = None
+        self._view_buffer = None
+        self._output_subsurface = None
+
+    @property
+    def scale_factor(self):
+        """int: The whole number factor the view is scaled by with
+        integer scaling, or 0 if the view is larger than the output
+        resolution (in which case it's scaled down as usual).
+
+        """
+
+        view_width, view_height = self.view_rect.size
+
+        if not (view_width and view_height):
+
+            return 0
+
+        return min(self.output_resolution[0] // view_width,
+                   self.output_resolution[1] // view_height)
+
+    @property
+    def output_rect(self):
+        """pygame.Rect: The area of this camera the view is drawn
+        to; all of it, unless integer scaling letterboxes the view.
+
+        """
+
+        scale_factor = self.scale_factor
+
+        if not (self.integer_scaling and scale_factor):
+
+            return self.get_rect()
+
+        output_rect = pygame.Rect(0, 0, self.view_rect.width * scale_factor,
+                                  self.view_rect.height * scale_factor)
+        output_rect.center = self.get_rect().center
+
+        return output_rect
+
+    @property
+    def source_offset(self):
+        """tuple[int, int]: Position of the source surface's topleft
+        in the environment; the view's topleft with a view-sized
+        source, otherwise (0, 0).
+
+        """
+
+        if self.view_sized_source:
+
+            return self.view_rect.topleft
+
+        return (0, 0)
+
+    def world_to_screen(self, position):
+        """Translate a position, or rect, in the environment to
+        where it is on the source surface.
+
+        Arguments:
+            position (tuple[int, int]|pygame.Rect): --
+
+        Returns:
+            tuple[int, int]|pygame.Rect: A rect if given a rect.
+
+        Example:
+            >>> camera = Camera((100, 100), (20, 20), (10, 10),
+            ...                 view_sized_source=True)
+            >>> camera.view_rect.topleft = (30, 40)
+            >>> camera.world_to_screen((35, 42))
+            (5, 2)
+
+        """
+
+        offset_x, offset_y = self.source_offset
+
+        if isinstance(position, pygame.Rect):
+
+            return position.move(-offset_x, -offset_y)
+
+        return (position[0] - offset_x, position[1] - offset_y)
+
+    def in_view(self, rect):
+        """Check if any of a rect, in the environment, is in view,
+        so whatever it belongs to can be skipped when drawing if
+        it's not.
+
+        Arguments:
+            rect (pygame.Rect): --
+
+        Returns:
+            bool: --
+
+        """
+
+        return bool(self.view_rect.colliderect(rect))
 
-    def update_state(self, timedelta):
+    def visible(self, group):
+        """Get the sprites which are (at least partly) in view.
+
+        Arguments:
+            group (iterable[pygame.sprite.Sprite]): The sprites to
+                check, e.g., a :class:`pygame.sprite.Group`. Their
+                rects are in the environment's coordinates.
+
+        Returns:
+            list[pygame.sprite.Sprite]: --
+
+        """
+
+        sprites = list(group)
+        visible_indexes = self.view_rect.collidelistall(
+            [sprite.rect for sprite in sprites]
+        )
+
+        return [sprites[i] for i in visible_indexes]
+
+    def draw_group(self, group, surface=None):
+        """Draw the sprites which are in view, like
+        :meth:`pygame.sprite.Group.draw`, but skipping those
+        off screen.
+
+        Arguments:
+            group (iterable[pygame.sprite.Sprite]): The sprites to
+                draw, with rects in the environment's coordinates.
+            surface (pygame.Surface|None): The surface to draw to,
+                in the same coordinates as the source surface, e.g.,
+                a layer. Defaults to the source surface.
+
+        Returns:
+            list[pygame.Rect]: The areas drawn to.
+
+        """
+
+        if surface is None:
+            surface = self.source_surface
+
+        offset_x, offset_y = self.source_offset
+        blit_sequence = [
+            (sprite.image,
+             (sprite.rect.left - offset_x, sprite.rect.top - offset_y))
+            for sprite in self.visible(group)
+        ]
+
+        return surface.blits(blit_sequence)
+
+    def update_state(self, timedelta, source_changed=True):
         """Update the Camera to point to the
         current scroll position.
 
@@ -157,30 +528,291 @@ class Camera(pygame.surface.Surface):
         the target_resolution. The new subsurface is then
         blit to the camera (which is a surface, itself!).
 
+        If the view is the same size as the output resolution,
+        it's blitted to the camera directly, without scaling.
+        If neither the view nor the source surface changed
+        since the last update, nothing is done at all.
+
         Arguments:
             timedelta (None): This isn't used at all, but it
                 is included as an argument for consistency.
+            source_changed (bool): Whether the source surface was
+                drawn to since the last update, e.g., whether
+                :meth:`sappho.layers.SurfaceLayers.render` returned
+                any updated areas.
 
         """
 
-        try:
-            subsurface = self.source_surface.subsurface(self.view_rect)
-        except ValueError:
+        view_rect = self.view_rect
+
+        if not source_changed and view_rect == self._rendered_view_rect:
+
+            return
+
+        source_rect = self.world_to_screen(view_rect)
+
+        if not (self.source_surface.get_rect().contains(source_rect) and
+                pygame.Rect((0, 0),
+                            self.source_resolution).contains(view_rect)):
             raise CameraOutOfBounds(self)
 
-        scaled_surface = pygame.transform.scale(subsurface,
-                                                self.output_resolution)
+        if self.integer_scaling and self.scale_factor:
+            self._blit_integer_scaled(source_rect)
+        elif view_rect.size == tuple(self.output_resolution):
+            super(Camera, self).blit(self.source_surface, (0, 0), source_rect)
+        else:
+
+            if self._scaled_surface is None:
+                self._scaled_surface = pygame.surface.Surface(
+                    self.output_resolution,
+                    pygame.SRCALPHA
+                )
+
+            # Scale into the same surface every time, rather than
+            # allocating a new one each frame.
+            subsurface = self.source_surface.subsurface(source_rect)
+            pygame.transform.scale(subsurface, self.output_resolution,
+                                   self._scaled_surface)
 
-        # Blit the scaled surface to this camera (which is also a surface)
-        super(Camera, self).blit(scaled_surface, (0, 0))
+            # Blit the scaled surface to this camera (which is also a surface)
+            super(Camera, self).blit(self._scaled_surface, (0, 0))
 
-    def scroll_to(self, focal_rectangle):
+        self._rendered_view_rect = view_rect.copy()
+
+    def _blit_integer_scaled(self, source_rect):
+        """Scale the view, the source rect of the source surface, by
+        the scale factor straight into its (letterboxed) area of this
+        camera.
+
+        The view is first copied into a buffer in this camera's
+        pixel format, so that it can be scaled into the camera
+        itself, rather than into another surface which would then
+        have to be blitted (with per-pixel alpha) to the camera.
+
+        """
+
+        if self._integer_view_size != source_rect.size:
+            self._integer_view_size = source_rect.size
+            self._view_buffer = pygame.surface.Surface(source_rect.size, 0,
+                                                       self)
+            self._output_subsurface = self.subsurface(self.output_rect)
+
+            # The letterbox
+            self.fill((0, 0, 0))
+
+        self._view_buffer.fill((0, 0, 0))
+        self._view_buffer.blit(self.source_surface, (0, 0), source_rect)
+        pygame.transform.scale(self._view_buffer,
+                               self._output_subsurface.get_size(),
+                               self._output_subsurface)
+
+    def scroll_to(self, focal_rectangle, timedelta=None):
         """Scroll to the given focal rectangle using the current behavior.
 
         Parameters:
             focal_rectangle (pygame.Rect): Rectangle to possibly update
                 the view position to using the camera's current behavior
+            timedelta (int|None): Milliseconds since the last scroll,
+                for behaviors which move over time, like
+                :class:`CameraSmoothBehavior`. Should be given every
+                frame, even if the focal rectangle hasn't moved.
+
+        """
+
+        if timedelta is None:
+            self.behavior.move(self, focal_rectangle)
+        else:
+            self.behavior.move(self, focal_rectangle, timedelta)
+
+
+class CameraSet(pygame.surface.Surface):
+    """Several cameras, each with its own view and behavior, drawn
+    side by side onto one surface, e.g., for split screen.
+
+    Either the cameras all view one shared source surface, so the
+    environment only has to be drawn once, or each camera has a
+    view-sized source surface, which only what's in its view is
+    drawn to (see :meth:`draw_group`). Either way, there's only one
+    environment-sized surface at most, however many cameras there are.
+
+    Arguments:
+        source_resolution (tuple[int, int]): Size of the environment.
+        output_resolution (tuple[int, int]): Size of this surface.
+        viewports (list[pygame.Rect]): The area of this surface
+            each camera is drawn to, e.g., from
+            :meth:`split_viewports`.
+        view_resolutions (list[tuple[int, int]]): The size of each
+            camera's view.
+        behaviors (list[CameraBehavior]|None): Each camera's behavior;
+            defaults to :class:`CameraBehavior` for all of them.
+        view_sized_source (bool): Give each camera its own view-sized
+            source surface rather than sharing one.
+        integer_scaling (bool): See :class:`Camera`.
+
+    Attributes:
+        cameras (list[Camera]): --
+        viewports (list[pygame.Rect]): --
+        source_surface (pygame.Surface|None): The source surface
+            shared by the cameras, or None if they have view-sized
+            ones.
+
+    """
+
+    def __init__(self, source_resolution, output_resolution, viewports,
+                 view_resolutions, behaviors=None, view_sized_source=False,
+                 integer_scaling=False):
+
+        super(CameraSet, self).__init__(output_resolution)
+
+        if view_sized_source:
+            self.source_surface = None
+        else:
+            self.source_surface = pygame.surface.Surface(source_resolution,
+                                                         pygame.SRCALPHA)
+
+        behaviors = behaviors or [None] * len(viewports)
+        self.viewports = [pygame.Rect(viewport) for viewport in viewports]
+        self.cameras = [
+            Camera(source_resolution, viewport.size, view_resolution,
+                   behavior=behavior, integer_scaling=integer_scaling,
+                   view_sized_source=view_sized_source,
+                   source_surface=self.source_surface)
+            for viewport, view_resolution, behavior
+            in zip(self.viewports, view_resolutions, behaviors)
+        ]
+
+    @staticmethod
+    def split_viewports(output_resolution, number_of_viewports,
+                        vertical=True):
+        """Split an output resolution into equal viewports.
+
+        Arguments:
+            output_resolution (tuple[int, int]): --
+            number_of_viewports (int): --
+            vertical (bool): Split into columns, rather than rows.
+
+        Returns:
+            list[pygame.Rect]: --
+
+        Example:
+            >>> CameraSet.split_viewports((100, 50), 2)
+            [<rect(0, 0, 50, 50)>, <rect(50, 0, 50, 50)>]
+
+        """
+
+        width, height = output_resolution
+        viewports = []
+
+        for i in range(number_of_viewports):
+
+            if vertical:
+                left = width * i // number_of_viewports
+                right = width * (i + 1) // number_of_viewports
+                viewports.append(pygame.Rect(left, 0, right - left, height))
+            else:
+                top = height * i // number_of_viewports
+                bottom = height * (i + 1) // number_of_viewports
+                viewports.append(pygame.Rect(0, top, width, bottom - top))
+
+        return viewports
+
+    def visible(self, group):
+        """Get the sprites which are in any camera's view.
+
+        Arguments:
+            group (iterable[pygame.sprite.Sprite]): --
+
+        Returns:
+            list[pygame.sprite.Sprite]: --
+
+        """
+
+        sprites = list(group)
+        rects = [sprite.rect for sprite in sprites]
+        visible_indexes = set()
+
+        for camera in self.cameras:
+            visible_indexes.update(camera.view_rect.collidelistall(rects))
+
+        return [sprites[i] for i in sorted(visible_indexes)]
+
+    def draw_group(self, group, surface=None):
+        """Draw the sprites which are in view: once, to the shared
+        source surface (or the surface given), if they're in any
+        camera's view, or, with view-sized sources, to the source
+        surface of each camera they're in view of.
+
+        Arguments:
+            group (iterable[pygame.sprite.Sprite]): The sprites to
+                draw, with rects in the environment's coordinates.
+            surface (pygame.Surface|None): The surface to draw to
+                instead of the shared source surface, e.g., a layer.
+
+        Returns:
+            list[pygame.Rect]: The areas drawn to.
+
+        """
+
+        if self.source_surface is None:
+            drawn_rects = []
+
+            for camera in self.cameras:
+                drawn_rects.extend(camera.draw_group(group))
+
+            return drawn_rects
+
+        if surface is None:
+            surface = self.source_surface
+
+        return surface.blits([(sprite.image, sprite.rect)
+                              for sprite in self.visible(group)])
+
+    def update_state(self, timedelta, source_changed=True):
+        """Update each camera, and draw it to its viewport.
+
+        Arguments:
+            timedelta (None): Passed on to
+                :meth:`Camera.update_state`.
+            source_changed (bool): See :meth:`Camera.update_state`.
+
+        """
+
+        blit = super(CameraSet, self).blit
+
+        for camera, viewport in zip(self.cameras, self.viewports):
+            camera.update_state(timedelta, source_changed)
+            blit(camera, viewport)
+
+    def __getitem__(self, key):
+        """Access a camera by its index.
+
+        Arguments:
+            key (int): --
+
+        Returns:
+            Camera: --
+
+        """
+
+        return self.cameras[key]
+
+    def __len__(self):
+        """Return the number of cameras.
+
+        Returns:
+            int: --
+
+        """
+
+        return len(self.cameras)
+
+    def __iter__(self):
+        """Iterate through the cameras.
+
+        Yields:
+            Camera
 
         """
 
-        self.behavior.move(self, focal_rectangle)
+        for camera in self.cameras:
+            yield camera
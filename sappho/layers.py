@@ -1,30 +1,386 @@
 # TODO: module level docstring
 import sys
+import math
+import weakref
+
 import pygame
 
 PY3 = sys.version_info[0] == 3
 range = range if PY3 else xrange
 
+ALPHA = "alpha"
+"""str: Layer mode with per-pixel alpha, the default."""
+
+OPAQUE = "opaque"
+"""str: Layer mode without any transparency, in the display's pixel
+format. The fastest to blit; ideal for a bottom layer which covers
+everything.
+"""
+
+COLORKEY = "colorkey"
+"""str: Layer mode where one color is transparent, in the display's
+pixel format. Much faster to blit than per-pixel alpha.
+"""
+
+DEFAULT_COLORKEY = (255, 0, 255)
+"""tuple[int, int, int]: The color which is transparent on layers
+in the COLORKEY mode, unless another is given.
+"""
+
+
+class LayerSurface(pygame.surface.Surface):
+    """A transparent surface which records the areas drawn
+    to it, so that only those areas have to be cleared.
+
+    Drawing with blit(), blits(), and fill() is recorded
+    automatically, as is drawing sprites with
+    :meth:`pygame.sprite.Group.draw`. Anything else, like
+    the :mod:`pygame.draw` functions, should be recorded with
+    :meth:`mark_drawn`.
+
+    A layer may only cover part of the surface it's rendered to,
+    starting at its offset. Positions given to blit(), blits(),
+    and fill() are translated by the offset, so they're always
+    in the coordinates of the surface rendered to (typically
+    world coordinates), as are the rects they return. Everything
+    else, like :mod:`pygame.draw`, uses the layer's own coordinates.
+
+    Attributes:
+        drawn_rects (list[pygame.Rect]): The areas drawn to
+            since this layer was last cleared, in the layer's
+            own coordinates.
+        offset (tuple[int, int]): Position of this layer's
+            topleft on the surface it's rendered to.
+        mode (str): How this layer is transparent; one of ALPHA,
+            OPAQUE, or COLORKEY.
+        special_flags (int): The blend flags this layer is
+            blitted with when rendered, e.g., pygame.BLEND_ADD.
+        clear_color (tuple): The color this layer is cleared to.
+
+    """
+
+    def __init__(self, size, offset=(0, 0), mode=ALPHA, special_flags=0,
+                 colorkey=DEFAULT_COLORKEY):
+
+        if mode == ALPHA:
+            super(LayerSurface, self).__init__(size, pygame.SRCALPHA, 32)
+            self.clear_color = (0, 0, 0, 0)
+        else:
+            # Match the display's pixel format if there is one, like
+            # Surface.convert(), so blitting doesn't have to convert.
+            display_surface = pygame.display.get_surface()
+
+            if display_surface is None:
+                super(LayerSurface, self).__init__(size)
+            else:
+                super(LayerSurface, self).__init__(size, 0, display_surface)
+
+            if mode == COLORKEY:
+                self.set_colorkey(colorkey)
+                self.clear_color = colorkey
+            else:
+                self.clear_color = (0, 0, 0)
+
+        self.mode = mode
+        self.special_flags = special_flags
+        self.drawn_rects = []
+        self.offset = offset
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        offset_x, offset_y = self.offset
+
+        if offset_x or offset_y:
+            dest = (dest[0] - offset_x, dest[1] - offset_y)
+
+        rect = super(LayerSurface, self).blit(source, dest, area,
+                                              special_flags)
+        self.drawn_rects.append(rect)
+
+        return rect.move(self.offset)
+
+    def blits(self, blit_sequence, doreturn=1):
+        offset_x, offset_y = self.offset
+
+        if offset_x or offset_y:
+            blit_sequence = [
+                (blit[0], (blit[1][0] - offset_x, blit[1][1] - offset_y)) +
+                tuple(blit[2:])
+                for blit in blit_sequence
+            ]
+
+        rects = super(LayerSurface, self).blits(blit_sequence, 1)
+        self.drawn_rects.extend(rects)
+
+        if doreturn:
+
+            return [rect.move(self.offset) for rect in rects]
+
+        return None
+
+    def fill(self, color, rect=None, special_flags=0):
+
+        if rect is not None and (self.offset[0] or self.offset[1]):
+            rect = pygame.Rect(rect).move(-self.offset[0], -self.offset[1])
+
+        rect = super(LayerSurface, self).fill(color, rect, special_flags)
+        self.drawn_rects.append(rect)
+
+        return rect.move(self.offset)
+
+    def mark_drawn(self, rect):
+        """Record an area as drawn to.
+
+        Arguments:
+            rect (pygame.Rect): The area drawn to, in this layer's
+                own coordinates, e.g., the rect returned by a
+                :mod:`pygame.draw` function.
+
+        """
+
+        self.drawn_rects.append(pygame.Rect(rect))
+
+    def clear(self, drawn_only=False):
+        """Make this layer fully transparent again (or, if it's
+        opaque, black), in place.
+
+        Arguments:
+            drawn_only (bool): Only clear the areas recorded
+                as drawn to, rather than the whole layer.
+
+        """
+
+        clear = super(LayerSurface, self).fill
+
+        if drawn_only:
+
+            for rect in self.drawn_rects:
+                clear(self.clear_color, rect)
+
+        else:
+            clear(self.clear_color)
+
+        self.drawn_rects = []
+
 
 class SurfaceLayers(object):
     """Ordered series of pygame surfaces, each the size of the target
     surface given at creation time.
 
+    The layers are created once, and cleared in place after
+    each render().
+
+    Alternatively, the layers can be the size of a viewport (plus
+    a margin), covering only the part of the target surface around
+    the view. Set the view with :meth:`set_view` before drawing each
+    frame. Drawing uses the target surface's coordinates either way;
+    see :class:`LayerSurface`.
+
     Arguments:
         target_surface (pygame.Surface): Surface that will have
             have the layers blitted to when render() is called. The size
             of this surface is used as the size of the generated layers.
         number_of_layers (int): Number of layers to generate.
+        clear_drawn_only (bool): After rendering, only clear the
+            areas of the layers that were drawn to, rather than
+            entire layers. See :class:`LayerSurface` for which
+            drawing is recorded.
+        dirty_rects (bool): Only composite the areas of the target
+            surface which changed since the last render(); the
+            union of the areas drawn to on any layer this frame
+            or the last. See :class:`LayerSurface` for which drawing
+            is recorded.
+        background_color (tuple|None): With `dirty_rects`, the color
+            each updated area of the target surface is filled with
+            before the layers are composited onto it, so nothing
+            lingers where every layer is transparent. None skips
+            the fill, e.g., when an opaque layer covers everything.
+        static_layers (iterable[int]): The z-indexes of the layers
+            to mark static, see :meth:`set_static`.
+        viewport_size (tuple[int, int]|None): If given, the layers
+            only cover a view of this size, plus margin, rather than
+            the entire target surface.
+        margin (int): Pixels the layers extend past each side of the
+            view, so that the view can move that far before the
+            layers have to be moved (see :meth:`set_view`).
 
     """
 
-    def __init__(self, target_surface, number_of_layers):
+    def __init__(self, target_surface, number_of_layers,
+                 clear_drawn_only=False, dirty_rects=False,
+                 static_layers=(), viewport_size=None, margin=0,
+                 background_color=(0, 0, 0)):
+
         self._target_surface = target_surface
+
+        if viewport_size is None:
+            self._layer_size = target_surface.get_size()
+        else:
+            self._layer_size = (viewport_size[0] + margin * 2,
+                                viewport_size[1] + margin * 2)
+
         self._surface_layers = self.create_surface_layers(target_surface,
-                                                          number_of_layers)
+                                                          number_of_layers,
+                                                          self._layer_size)
+        self.margin = margin
+        self.clear_drawn_only = clear_drawn_only
+        self.dirty_rects = dirty_rects
+        self.background_color = background_color
+        self._last_drawn_rects = []
+
+        self._static = [False] * number_of_layers
+        self._static_caches = {}
+
+        for z_index in static_layers:
+            self.set_static(z_index)
+
+    @property
+    def offset(self):
+        """tuple[int, int]: Position of the layers' topleft on
+        the target surface.
+
+        """
+
+        return self._surface_layers[0].offset if self else (0, 0)
+
+    @property
+    def rect(self):
+        """pygame.Rect: The area of the target surface covered
+        by the layers.
+
+        """
+
+        return pygame.Rect(self.offset, self._layer_size)
+
+    def set_view(self, view_rect):
+        """Make sure the layers cover the view, moving them to
+        center on it if they don't.
+
+        Moving the layers wipes the static layers, which have to be
+        drawn again, so the return value should be checked.
+
+        Arguments:
+            view_rect (pygame.Rect): The area of the target surface
+                in view, e.g., :attr:`sappho.camera.Camera.view_rect`.
+
+        Returns:
+            bool: True if the layers were moved.
+
+        """
+
+        if self.rect.contains(view_rect):
+
+            return False
+
+        offset = (view_rect.left - self.margin, view_rect.top - self.margin)
+
+        # Everything that was on screen, and what will be, has to
+        # be composited again.
+        self._last_drawn_rects.append(pygame.Rect((0, 0), self._layer_size))
+        self._last_drawn_rects.append(
+            pygame.Rect((0, 0), self._layer_size).move(
+                self.offset[0] - offset[0],
+                self.offset[1] - offset[1]
+            )
+        )
+
+        for surface in self._surface_layers:
+            surface.offset = offset
+            surface.clear()
+
+        self._static_caches = {}
+
+        return True
+
+    def set_mode(self, z_index, mode, special_flags=0,
+                 colorkey=DEFAULT_COLORKEY):
+        """Change how a layer is transparent and blended when
+        it's rendered, so the fastest blit for it can be used.
+
+        The layer is replaced by a new, cleared, surface.
+
+        Arguments:
+            z_index (int): The z-index of the layer.
+            mode (str): ALPHA (per-pixel alpha), OPAQUE (no
+                transparency, fastest) or COLORKEY (one color
+                is transparent).
+            special_flags (int): Blend flags to render the
+                layer with, e.g., pygame.BLEND_ADD.
+            colorkey (tuple[int, int, int]): The transparent
+                color of a COLORKEY layer.
+
+        """
+
+        old_surface = self._surface_layers[z_index]
+        surface = LayerSurface(self._layer_size, old_surface.offset, mode,
+                               special_flags, colorkey)
+        surface.clear()
+        self._surface_layers[z_index] = surface
+        self._static_caches = {}
+        self._recomposite()
+
+    def set_static(self, z_index, static=True):
+        """Mark a layer as static (or dynamic again).
+
+        Static layers are not wiped by render(), so what's drawn to
+        them only has to be drawn once, e.g., a tilemap. Consecutive
+        static layers are flattened into one cached surface, which is
+        composited as if it were a single layer. Layers with blend
+        flags (see :meth:`set_mode`) are never flattened.
+
+        Drawing to a static layer updates its cached surface on the
+        next render(). See :class:`LayerSurface` for which drawing
+        is recorded, and :meth:`invalidate` for anything else.
+
+        Note:
+            Flattening is exact, except where several static layers
+            have partially transparent pixels on top of each other.
+
+        Arguments:
+            z_index (int): The z-index of the layer.
+            static (bool): False to make the layer dynamic again.
+
+        """
+
+        self._static[z_index] = static
+
+        # The runs of consecutive static layers have changed
+        self._static_caches = {}
+        self._recomposite()
+
+    def invalidate(self, z_index=None):
+        """Rebuild the cached surface of static layers on the next
+        render(), e.g., after drawing to a static layer in a way
+        that isn't recorded by :class:`LayerSurface`.
+
+        Arguments:
+            z_index (int|None): The static layer that changed, or
+                None to rebuild all cached surfaces.
+
+        """
+
+        if z_index is None:
+            self._static_caches = {}
+        else:
+
+            for start, stop in list(self._static_caches):
+
+                if start <= z_index < stop:
+                    del self._static_caches[(start, stop)]
+
+        self._recomposite()
+
+    def _recomposite(self):
+        """Composite the whole of the layers on the next render(),
+        even with `dirty_rects`, e.g., after a static layer changed
+        without the change being recorded.
+
+        """
+
+        self._last_drawn_rects.append(pygame.Rect((0, 0), self._layer_size))
 
     @staticmethod
-    def create_surface_layers(target_surface, number_of_layers):
+    def create_surface_layers(target_surface, number_of_layers,
+                              layer_size=None):
         """Create a list of pygame surfaces
         the size of the target surface.
 
@@ -33,17 +389,19 @@ class SurfaceLayers(object):
                 whose dimensions will be used for each layer.
             number_of_layers (int): The number of surfaces to
                 create/return.
+            layer_size (tuple[int, int]|None): Size to use
+                instead of the target surface's.
 
         Returns:
-            list[pygame.Surface]: List of surfaces
+            list[LayerSurface]: List of surfaces
 
         """
 
         surface_layers = []
+        layer_size = layer_size or target_surface.get_size()
 
         for i in range(number_of_layers):
-            surface = pygame.surface.Surface(target_surface.get_size(),
-                                             pygame.SRCALPHA, 32)
+            surface = LayerSurface(layer_size)
             surface_layers.append(surface)
 
         return surface_layers
@@ -94,12 +452,329 @@ class SurfaceLayers(object):
         if we didn't wipe you'd see that column drag across the screen as the
         camera moved.
 
-        """
+        The layers are wiped in place, rather than being created
+        anew each frame.
 
-        for surface in self._surface_layers:
-            self._target_surface.blit(surface, (0, 0))
+        Returns:
+            list[pygame.Rect]: The areas of the target surface which
+                were updated, e.g., for `pygame.display.update()`.
+                This is the entire target surface, unless the
+                `dirty_rects` option was given.
+
+        """
 
         target_surface = self._target_surface
-        number_of_layers = len(self._surface_layers)
-        self._surface_layers = self.create_surface_layers(target_surface,
-                                                          number_of_layers)
+        sources = self._composite_sources()
+
+        if self.dirty_rects:
+            drawn_rects = []
+            dynamic_drawn_rects = []
+
+            for surface, static in zip(self._surface_layers, self._static):
+                drawn_rects.extend(surface.drawn_rects)
+
+                if not static:
+                    dynamic_drawn_rects.extend(surface.drawn_rects)
+
+            # What was drawn to dynamic layers last frame has to be
+            # composited again, too, since it's been wiped since.
+            layer_rect = pygame.Rect((0, 0), self._layer_size)
+            layer_rects = [rect.clip(layer_rect) for rect in
+                           merge_rects(drawn_rects + self._last_drawn_rects)]
+            self._last_drawn_rects = dynamic_drawn_rects
+
+            for rect in layer_rects:
+                position = (rect.left + self.offset[0],
+                            rect.top + self.offset[1])
+
+                # Wipe what was composited here last time, e.g., where
+                # a sprite was, since the layers may not cover it.
+                if self.background_color is not None:
+                    target_surface.fill(self.background_color,
+                                        pygame.Rect(position, rect.size))
+
+                for surface, special_flags in sources:
+                    target_surface.blit(surface, position, rect,
+                                        special_flags)
+
+            target_rect = target_surface.get_rect()
+            updated_rects = [rect.move(self.offset).clip(target_rect)
+                             for rect in layer_rects]
+
+        else:
+            updated_rects = [self.rect.clip(target_surface.get_rect())]
+            self._last_drawn_rects = []
+
+            for surface, special_flags in sources:
+                target_surface.blit(surface, self.offset, None,
+                                    special_flags)
+
+        for surface, static in zip(self._surface_layers, self._static):
+
+            if static:
+                surface.drawn_rects = []
+            else:
+                surface.clear(self.clear_drawn_only)
+
+        return updated_rects
+
+    def _composite_sources(self):
+        """The surfaces to composite onto the target surface, in
+        order: each dynamic layer, and the (cached) flattening of
+        each run of consecutive static layers.
+
+        Brings the cached surfaces up to date.
+
+        Returns:
+            list[tuple[pygame.Surface, int]]: Each surface, along
+                with the blend flags to blit it with.
+
+        """
+
+        sources = []
+        z_index = 0
+        layers = self._surface_layers
+        number_of_layers = len(layers)
+
+        def flattenable(z_index):
+
+            return self._static[z_index] and not layers[z_index].special_flags
+
+        while z_index < number_of_layers:
+
+            if not flattenable(z_index):
+                surface = layers[z_index]
+                sources.append((surface, surface.special_flags))
+                z_index += 1
+
+                continue
+
+            start = z_index
+
+            while z_index < number_of_layers and flattenable(z_index):
+                z_index += 1
+
+            if z_index - start == 1:
+                # Nothing to flatten
+                sources.append((layers[start], 0))
+            else:
+                sources.append((self._static_cache(start, z_index), 0))
+
+        return sources
+
+    def _static_cache(self, start, stop):
+        """Get the flattened surface of the static layers from
+        z-index start up to stop, rebuilding what has changed.
+
+        """
+
+        layers = self._surface_layers[start:stop]
+        cache = self._static_caches.get((start, stop))
+
+        if cache is None:
+            cache = pygame.surface.Surface(self._layer_size,
+                                           pygame.SRCALPHA, 32)
+
+            for surface in layers:
+                cache.blit(surface, (0, 0))
+
+            self._static_caches[(start, stop)] = cache
+
+            return cache
+
+        drawn_rects = []
+
+        for surface in layers:
+            drawn_rects.extend(surface.drawn_rects)
+
+        for rect in merge_rects(drawn_rects):
+            cache.fill((0, 0, 0, 0), rect)
+
+            for surface in layers:
+                cache.blit(surface, rect.topleft, rect)
+
+        return cache
+
+
+class ParallaxLayer(object):
+    """A texture repeating endlessly in every direction, which
+    scrolls at a fraction of the speed of the view, so that it
+    seems further away (or, faster, closer).
+
+    The texture is tiled once into a cached wrap surface at least
+    the size of the view, so drawing the view takes at most four
+    blits, however large the view is compared to the texture.
+
+    The image may be changed at any time, e.g., to the current
+    frame of an :class:`sappho.animate.AnimatedSprite`; a wrap
+    surface is cached for each image.
+
+    Arguments:
+        image (pygame.Surface): The texture to repeat.
+        scroll_factor (float|tuple[float, float]): How far the
+            texture scrolls for every pixel the view moves, along
+            each axis. 0 keeps the texture still on screen, 1
+            scrolls it with the world.
+
+    Attributes:
+        image (pygame.Surface): The texture to repeat.
+        scroll_factor (tuple[float, float]): --
+
+    """
+
+    def __init__(self, image, scroll_factor=0.5):
+        self.image = image
+
+        if isinstance(scroll_factor, (int, float)):
+            scroll_factor = (scroll_factor, scroll_factor)
+
+        self.scroll_factor = tuple(scroll_factor)
+        self._wrap_surfaces = weakref.WeakKeyDictionary()
+
+    def wrap_surface(self, view_size):
+        """Get the image tiled into a surface at least as large
+        as the view, in whole repeats of the image, so that it
+        repeats seamlessly itself.
+
+        Arguments:
+            view_size (tuple[int, int]): --
+
+        Returns:
+            pygame.Surface: --
+
+        """
+
+        image = self.image
+        wrap_surface = self._wrap_surfaces.get(image)
+
+        if (wrap_surface is not None and
+                wrap_surface.get_width() >= view_size[0] and
+                wrap_surface.get_height() >= view_size[1]):
+
+            return wrap_surface
+
+        image_width, image_height = image.get_size()
+        repeats_x = max(1, -(-view_size[0] // image_width))
+        repeats_y = max(1, -(-view_size[1] // image_height))
+        wrap_surface = pygame.surface.Surface(
+            (image_width * repeats_x, image_height * repeats_y),
+            image.get_flags() & pygame.SRCALPHA,
+            image
+        )
+        colorkey = image.get_colorkey()
+
+        # Keep a colorkeyed image's transparent pixels transparent
+        if colorkey is not None:
+            wrap_surface.fill(colorkey)
+            wrap_surface.set_colorkey(colorkey)
+
+        for x in range(repeats_x):
+
+            for y in range(repeats_y):
+                wrap_surface.blit(image, (x * image_width, y * image_height))
+
+        self._wrap_surfaces[image] = wrap_surface
+
+        return wrap_surface
+
+    def draw(self, surface, view_rect):
+        """Draw the texture over the entire view.
+
+        Arguments:
+            surface (pygame.Surface): The surface to draw to, e.g.,
+                a :class:`LayerSurface`, in the same coordinates
+                as the view rect.
+            view_rect (pygame.Rect): The area of the surface in
+                view, e.g., :attr:`sappho.camera.Camera.view_rect`.
+
+        Returns:
+            list[pygame.Rect]: The areas drawn to; at most four.
+
+        """
+
+        wrap_surface = self.wrap_surface(view_rect.size)
+        wrap_width, wrap_height = wrap_surface.get_size()
+
+        # The point of the wrap surface at the view's topleft
+        wrap_x = int(math.floor(view_rect.left * self.scroll_factor[0]))
+        wrap_y = int(math.floor(view_rect.top * self.scroll_factor[1]))
+        wrap_x %= wrap_width
+        wrap_y %= wrap_height
+
+        # The view is covered by (up to) two strips of the wrap surface
+        # along each axis: the end of the surface, then its start.
+        columns = self._strips(wrap_x, wrap_width, view_rect.width)
+        rows = self._strips(wrap_y, wrap_height, view_rect.height)
+        blit_sequence = []
+
+        for area_x, dest_x, width in columns:
+
+            for area_y, dest_y, height in rows:
+                blit_sequence.append((
+                    wrap_surface,
+                    (view_rect.left + dest_x, view_rect.top + dest_y),
+                    pygame.Rect(area_x, area_y, width, height),
+                ))
+
+        return surface.blits(blit_sequence)
+
+    @staticmethod
+    def _strips(start, wrap_length, view_length):
+        """Split a wrapping span of the view's length, starting
+        at start, into the parts before and after the wrap.
+
+        Returns:
+            list[tuple[int, int, int]]: The start in the wrap
+                surface, the start in the view, and the length
+                of each part.
+
+        """
+
+        first_length = min(wrap_length - start, view_length)
+        strips = [(start, 0, first_length)]
+
+        if first_length < view_length:
+            strips.append((0, first_length, view_length - first_length))
+
+        return strips
+
+
+def merge_rects(rects):
+    """Merge overlapping rects together, so no area is
+    covered by more than one rect.
+
+    Overlapping rects are replaced with the smallest rect
+    containing both. Empty rects are dropped.
+
+    Arguments:
+        rects (list[pygame.Rect]): --
+
+    Returns:
+        list[pygame.Rect]: Rects which don't overlap.
+
+    Example:
+        >>> merge_rects([pygame.Rect(0, 0, 2, 2), pygame.Rect(1, 1, 2, 2),
+        ...              pygame.Rect(5, 5, 1, 1), pygame.Rect(0, 0, 0, 0)])
+        [<rect(0, 0, 3, 3)>, <rect(5, 5, 1, 1)>]
+
+    """
+
+    merged_rects = []
+
+    for rect in rects:
+
+        if not (rect.width and rect.height):
+
+            continue
+
+        rect = pygame.Rect(rect)
+        overlapping_index = rect.collidelist(merged_rects)
+
+        # Absorbing a rect can make this one overlap others
+        while overlapping_index != -1:
+            rect.union_ip(merged_rects.pop(overlapping_index))
+            overlapping_index = rect.collidelist(merged_rects)
+
+        merged_rects.append(rect)
+
+    return merged_rects
@@ -21,22 +21,48 @@ is used on these.
 
     Physics: each physics function take a time delta and a particle and
         modifies the particle in some way.  It could move or accelerate the
-        particle, change the particle's species, etc.
+        particle, change the particle's species, etc.  Physics may also have
+        an `apply_batch(dt, arrays)` method, doing the same to every particle
+        in a `ParticleArrays` at once; all of the physics here do.
 
     Artist: this receives a surface to draw on, and a particle, and is
         responsible for drawing the particle on the surface as specified.
         Typically a drawer decides what the particle looks like, if it's
-        stretched by velocity, etc.
+        stretched by velocity, etc.  Artists may also have a
+        `draw_batch(surface, particles)` method, drawing all of a system's
+        particles at once.
 
     ParticleSystem: the current state of a system of particles, including
         all current particles, the physics that affects them, and the artists
         that illustrate them.
+
+    ParticleManager: owns many particle systems, updating and drawing them
+        together, dropping them once they're dead, and keeping the total
+        number of particles within a budget.
+
+    ParticleRandom: a seedable stream of random numbers owned by each
+        particle system, generating them in bulk for array-backed systems,
+        so effects can be replayed exactly.
+
+    ParticleProcessPool: optionally simulates the physics of huge
+        array-backed particle systems across several processes.
+
+    ParticleArrays: optional storage of a particle system's particles as
+        one array per attribute, rather than a Particle object each.  Physics
+        with an `apply_batch(dt, arrays)` method update all of the particles
+        at once, which is much faster for large systems.  Uses NumPy if it's
+        installed, otherwise the standard library's `array` module.
 """
 from __future__ import division
+import collections
 import copy
 import itertools
 import math
+import multiprocessing
+import pickle
 import random
+import weakref
+from array import array
 
 
 try:  # pragma: no cover
@@ -46,6 +72,17 @@ except ImportError:  # pragma: no cover
     class pygame:
         BLEND_RGBA_MULT = 8
 
+try:  # pragma: no cover
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+try:  # pragma: no cover
+    from multiprocessing import shared_memory
+except ImportError:  # pragma: no cover
+    # Python < 3.8
+    shared_memory = None
+
 
 # The biggest number less than infinity-plus-one
 INFINITY = float('inf')
@@ -125,6 +162,9 @@ class ParticleSystem(object):
             artist=None,
             particle_limit=512,
             launcher_dt=1.0,
+            array_backed=False,
+            process_pool=None,
+            seed=None,
     ):
         """Create a new particle system.
 
@@ -137,7 +177,9 @@ class ParticleSystem(object):
             launcher (callable): A physics function that is called on a new
                 particle just after being created with an effective time
                 delta of one second.  This can apply initial velocity,
-                lifetime, etc of the particle.
+                lifetime, etc of the particle.  Particles are recycled once
+                they die, so the launcher may be given a dead particle which
+                has been reset to the origin particle's attributes.
             physics (callable): A physics function that take a time delta (
                 in seconds) and a particle, and applies an update to the
                 particle physics that would occur in that period of time.
@@ -148,17 +190,48 @@ class ParticleSystem(object):
             particle_limit (int): The maximum ever allowed number of particles.
             launcher_dt (float): Effective number of seconds the launcher
                 physics is applied to a new particle.
+            array_backed (bool): Store particles in `ParticleArrays`, rather
+                than as a list of `Particle` objects, so physics supporting
+                it can update them all at once.  All particles then share
+                the origin particle's species.
+            process_pool (ParticleProcessPool): Pool of processes to split
+                the physics simulation across.  Requires `array_backed`,
+                and NumPy.
+            seed (int): Seed for the system's random numbers, `random`.
+                Systems given the same seed, and updated the same way,
+                produce the same particles.  Requires `array_backed`,
+                since particle objects are jittered one at a time, with
+                the `random` module.
 
         """
         self.origin = origin_particle
         self.emitter = emitter
-        self.launcher = launcher or (lambda *x: None)
+        self.launcher = launcher or PhysicsKick()
         self.launcher_dt = launcher_dt
         self.physics = physics or PhysicsInertia()
         self.is_emitting = True
         self.artist = artist
         self.particle_limit = particle_limit
-        self.particles = list()
+        self.array_backed = array_backed
+        self.random = ParticleRandom(seed)
+        if array_backed:
+            self.particles = ParticleArrays(
+                species=origin_particle.species, random=self.random
+            )
+        else:
+            self.particles = list()
+        if process_pool is not None and not (
+                array_backed and self.particles.use_numpy):
+            raise ValueError(
+                'A process pool requires array_backed particles, and NumPy'
+            )
+        if seed is not None and not array_backed:
+            raise ValueError('A seed requires array_backed particles')
+        self.process_pool = process_pool
+        # Dead particles, to be reset and launched again, rather than
+        # allocating new particles.  Never more than the particle limit,
+        # since particles are only ever alive or here.
+        self._free_particles = list()
 
     def is_alive(self):
         """Is this particle system still running? Either emitting new
@@ -168,23 +241,80 @@ class ParticleSystem(object):
         """
         return self.particles or self.is_emitting
 
-    def update_state(self, dt):
+    def update_state(self, dt, launch_limit=None):
         """Simulate physics for `dt` seconds.
 
         Arguments:
             dt (float): Number of elapsed seconds since last update.
+            launch_limit (int): Maximum number of new particles to launch,
+                on top of the particle limit, e.g., to keep within a
+                `ParticleManager`'s budget.
+
+        Returns:
+            int: Number of new particles launched.
         """
         new_particle_count = self._get_new_particle_count(dt)
-        for _ in range(new_particle_count):
-            self._launch()
-        for particle in self.particles:
-            self.physics(dt, particle)
+        if launch_limit is not None:
+            new_particle_count = min(new_particle_count, launch_limit)
+        if self.array_backed:
+            if new_particle_count > 0:
+                self.particles.extend(self._new_arrays(new_particle_count))
+            if self.process_pool is not None:
+                self.process_pool.apply(dt, self.physics, self.particles)
+            else:
+                self.particles.apply(dt, self.physics)
+        else:
+            for _ in range(new_particle_count):
+                self._launch()
+            for particle in self.particles:
+                self.physics(dt, particle)
         self._discard_dead_particles()
+        return max(new_particle_count, 0)
 
     def draw_on(self, surface):
-        """Draw all particles on the given surface."""
-        for particle in self.particles:
-            self.artist(surface, particle)
+        """Draw all particles on the given surface.
+
+        Uses the artist's `draw_batch(surface, particles)` method if it has
+        one, otherwise calls the artist once per particle.
+        """
+        draw_batch = getattr(self.artist, 'draw_batch', None)
+        if draw_batch is not None:
+            draw_batch(surface, self.particles)
+        else:
+            for particle in self.particles:
+                self.artist(surface, particle)
+
+    def bounds(self):
+        """Get the area covered by the particles, including the artist's
+        image if it has `image` and `origin` attributes, like the artists
+        here.
+
+        Returns:
+            tuple of float: The left, top, right, and bottom of the area,
+                or None if there are no particles.
+        """
+        if not len(self.particles):
+            return None
+        if isinstance(self.particles, ParticleArrays):
+            xs, ys = self.particles.x, self.particles.y
+        else:
+            xs = [particle.x for particle in self.particles]
+            ys = [particle.y for particle in self.particles]
+        if numpy is not None and isinstance(xs, numpy.ndarray):
+            left, right = float(xs.min()), float(xs.max())
+            top, bottom = float(ys.min()), float(ys.max())
+        else:
+            left, right = min(xs), max(xs)
+            top, bottom = min(ys), max(ys)
+        image = getattr(self.artist, 'image', None)
+        origin = getattr(self.artist, 'origin', None)
+        if image is not None and origin is not None:
+            width, height = image.get_size()
+            left -= origin[0]
+            top -= origin[1]
+            right += width - origin[0]
+            bottom += height - origin[1]
+        return left, top, right, bottom
 
     # Internal methods
     def _get_new_particle_count(self, dt):
@@ -201,22 +331,609 @@ class ParticleSystem(object):
 
     def _launch(self):
         """Build and launch a particle."""
-        new_particle = copy.copy(self.origin)
+        self.particles.append(self._new_particle())
+
+    def _new_particle(self):
+        """Build a particle, with the launcher applied.
+
+        Recycles a dead particle if there is one.
+        """
+        if self._free_particles:
+            new_particle = self._free_particles.pop()
+            _reset_particle(new_particle, self.origin)
+        else:
+            new_particle = copy.copy(self.origin)
         self.launcher(self.launcher_dt, new_particle)
         new_particle.initial_life = new_particle.life
-        self.particles.append(new_particle)
+        return new_particle
+
+    def _new_arrays(self, count):
+        """Build `count` particles as arrays, with the launcher applied to
+        all of them at once if it supports it.
+        """
+        new_arrays = ParticleArrays.from_particle(
+            self.origin, count, use_numpy=self.particles.use_numpy
+        )
+        new_arrays.random = self.random
+        new_arrays.apply(self.launcher_dt, self.launcher)
+        new_arrays.initial_life = new_arrays._new_array(new_arrays.life)
+        return new_arrays
 
     def _discard_dead_particles(self):
         """Get rid of all no longer active particles (life <= 0)."""
+        if self.array_backed:
+            self.particles.compact()
+            return
         write_index = 0
         for read_index, particle in enumerate(self.particles):
             if particle.life > 0:
                 if read_index > write_index:
                     self.particles[write_index] = particle
                 write_index += 1
+            else:
+                self._free_particles.append(particle)
         del self.particles[write_index:]
 
 
+class ParticleManager(object):
+    """Updates and draws many particle systems together.
+
+    Systems are dropped automatically once they're no longer alive.  The
+    total number of particles in all the systems can be kept within a
+    budget: when there are too many, new particles are simply not launched,
+    so effects thin out under load rather than slowing the game down.
+    Drawing can skip systems entirely outside of the view.
+
+    Attributes:
+        systems (list of ParticleSystem): The systems being managed.
+        particle_budget (int): Maximum total number of particles, or None
+            for no limit.
+    """
+    def __init__(self, particle_budget=None):
+        """Create a manager with no systems.
+
+        Arguments:
+            particle_budget (int): Maximum total number of particles, or
+                None for no limit.
+        """
+        self.systems = list()
+        self.particle_budget = particle_budget
+        # Which system launches first, rotated every update so no system
+        # is always the one left without budget
+        self._first_index = 0
+
+    def __len__(self):
+        return len(self.systems)
+
+    def __iter__(self):
+        return iter(self.systems)
+
+    def add(self, *systems):
+        """Add particle systems.
+
+        Arguments:
+            systems (list of ParticleSystem): Systems to manage.
+        """
+        self.systems.extend(systems)
+        return self
+
+    def particle_count(self):
+        """Get the total number of particles in all the systems."""
+        return sum(len(system.particles) for system in self.systems)
+
+    def update_state(self, dt):
+        """Simulate physics for `dt` seconds in all systems, then drop the
+        systems which are no longer alive.
+
+        Arguments:
+            dt (float): Number of elapsed seconds since last update.
+        """
+        systems = self.systems
+        if not systems:
+            return
+        first_index = self._first_index % len(systems)
+        ordered = systems[first_index:] + systems[:first_index]
+        self._first_index = first_index + 1
+
+        if self.particle_budget is None:
+            for system in ordered:
+                system.update_state(dt)
+        else:
+            available = self.particle_budget - self.particle_count()
+            for system in ordered:
+                available -= system.update_state(
+                    dt, launch_limit=max(available, 0)
+                )
+
+        self.systems = [system for system in systems if system.is_alive()]
+
+    def draw_on(self, surface, view_rect=None):
+        """Draw all systems on the given surface.
+
+        Arguments:
+            surface (pygame.Surface): Surface to draw on
+            view_rect (pygame.Rect): If given, systems whose particles are
+                entirely outside of this area (see `ParticleSystem.bounds`)
+                aren't drawn.
+        """
+        for system in self.systems:
+            if view_rect is not None:
+                bounds = system.bounds()
+                if bounds is None:
+                    continue
+                left, top, right, bottom = bounds
+                if (right <= view_rect.left or left >= view_rect.right or
+                        bottom <= view_rect.top or top >= view_rect.bottom):
+                    continue
+            system.draw_on(surface)
+
+
+class ParticleRandom(object):
+    """A seedable stream of normally distributed random numbers, generated
+    in bulk.
+
+    Uses a NumPy `Generator` if NumPy is installed.  Otherwise, a
+    table of standard normal samples is generated once, and each request
+    is served from it, starting from a random position; much faster than
+    sampling each number, at the cost of the numbers repeating over large
+    enough requests.
+
+    Attributes:
+        use_numpy (bool): Whether a NumPy generator is used.
+    """
+    def __init__(self, seed=None, table_size=4096, use_numpy=None):
+        """Create the stream.
+
+        Arguments:
+            seed (int): Seed; the same seed gives the same numbers.  By
+                default, unpredictable.
+            table_size (int): Number of samples in the table used without
+                NumPy.
+            use_numpy (bool): Whether to use NumPy; by default, if it's
+                installed.
+        """
+        if use_numpy is None:
+            use_numpy = numpy is not None
+        self.use_numpy = use_numpy
+        self._random = random.Random(seed)
+        if use_numpy:
+            numpy_seed = self._random.getrandbits(32)
+            if hasattr(numpy.random, 'default_rng'):
+                self._generator = numpy.random.default_rng(numpy_seed)
+            else:  # pragma: no cover
+                self._generator = numpy.random.RandomState(numpy_seed)
+        else:
+            self._table = [
+                self._random.gauss(0, 1) for _ in range(table_size)
+            ]
+
+    def normal(self, scale, count):
+        """Get normally distributed random numbers, centered on 0.
+
+        Arguments:
+            scale (float): Standard deviation; may be negative, e.g., a
+                negative jitter factor, which gives the same distribution.
+            count (int): How many numbers.
+
+        Returns:
+            sequence of float: A NumPy array if NumPy is used.
+        """
+        if self.use_numpy:
+            # NumPy rejects negative scales
+            return self._generator.normal(0, abs(scale), count)
+        table = self._table
+        start = self._random.randrange(len(table))
+        samples = itertools.islice(
+            itertools.cycle(table[start:] + table[:start]), count
+        )
+        return [scale * sample for sample in samples]
+
+    def seed_value(self):
+        """Get a seed, from this stream, for another stream."""
+        return self._random.getrandbits(32)
+
+
+class ParticleProcessPool(object):
+    """Splits the physics simulation of array-backed particle systems
+    across a pool of processes, for huge systems (rain, snow, smoke over
+    a whole map, etc).
+
+    The particles' arrays are moved into a block of shared memory the
+    first time (see `ParticleArrays.share`), and stay there, so each update
+    only sends the processes the physics, pickled once, and the range of
+    particles each one simulates in place.  Systems with fewer than two
+    shards' worth of particles, or physics which can't be pickled (e.g.,
+    lambdas), are simulated in this process as usual.
+
+    Requires NumPy and Python 3.8 or later.  One pool can be shared by any
+    number of particle systems; call `close` once done with it.
+
+    Attributes:
+        processes (int): Number of processes.
+        min_shard_size (int): Least number of particles to give a process.
+    """
+    def __init__(self, processes=None, min_shard_size=10000):
+        """Create the pool.  Processes are started when first needed.
+
+        Arguments:
+            processes (int): Number of processes; by default, the number
+                of CPUs.
+            min_shard_size (int): Least number of particles to give a
+                process.
+        """
+        if numpy is None or shared_memory is None:
+            raise RuntimeError(
+                'ParticleProcessPool requires NumPy and Python 3.8+'
+            )
+        self.processes = processes or multiprocessing.cpu_count()
+        self.min_shard_size = min_shard_size
+        self._pool = None
+        # Physics which couldn't be pickled, so they aren't tried again
+        self._unpicklable = weakref.WeakKeyDictionary()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def apply(self, dt, physics, arrays):
+        """Apply physics to all particles, split across the processes.
+
+        Arguments:
+            dt (float): Elapsed seconds.
+            physics (callable): Physics function.
+            arrays (ParticleArrays): Particles to update, using NumPy.
+        """
+        count = len(arrays)
+        shard_count = min(self.processes, count // self.min_shard_size)
+        pickled_physics = None
+        if shard_count >= 2:
+            pickled_physics = self._pickle(physics)
+        if pickled_physics is None:
+            arrays.apply(dt, physics)
+            return
+
+        name, capacity = arrays.share()
+        # Each shard gets its own stream of random numbers, seeded from
+        # the system's, so the results can still be reproduced.
+        self._get_pool().map(_apply_shard, [
+            (
+                name, capacity,
+                count * shard // shard_count,
+                count * (shard + 1) // shard_count,
+                dt, pickled_physics, arrays.species,
+                None if arrays.random is None
+                else arrays.random.seed_value(),
+            )
+            for shard in range(shard_count)
+        ])
+
+    def close(self):
+        """Stop the processes."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(
+                self.processes, initializer=_seed_worker
+            )
+        return self._pool
+
+    def _pickle(self, physics):
+        """Pickle physics to send to the processes, or get None if they
+        can't be.  Picklable physics are pickled every update, since they
+        may have changed since the last.
+        """
+        try:
+            if physics in self._unpicklable:
+                return None
+        except TypeError:
+            # Can't be weakly referenced, so isn't remembered
+            pass
+        try:
+            return pickle.dumps(physics, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            try:
+                self._unpicklable[physics] = True
+            except TypeError:
+                pass
+            return None
+
+
+class ParticleArrays(object):
+    """Particles stored as one array per attribute (structure of arrays).
+
+    Each of the attributes in `FIELDS` is an array with an element per
+    particle: a NumPy array if NumPy is used, otherwise an `array('d')`.
+    Physics operating on a whole system at once can use the methods here,
+    which work with either kind of array, or the arrays directly.
+
+    Iterating, or indexing, gives `Particle` objects holding copies of a
+    particle's attributes, e.g., for artists.
+
+    Once `share` is called, the NumPy arrays are views of a block of shared
+    memory, and stay that way as particles are added and removed.
+
+    Attributes:
+        x, y, dx, dy, life, initial_life (array): The particles'
+            attributes; see `Particle`.
+        species (str): The species of every particle.
+        use_numpy (bool): Whether the arrays are NumPy arrays.
+        random (ParticleRandom): Random numbers for physics to use, or
+            None to use the global random number generators.
+    """
+    FIELDS = ('x', 'y', 'dx', 'dy', 'life', 'initial_life')
+
+    def __init__(self, species=None, use_numpy=None, random=None):
+        """Create empty storage.
+
+        Arguments:
+            species (str): The species of every particle.
+            use_numpy (bool): Whether to use NumPy arrays; by default,
+                if NumPy is installed.
+            random (ParticleRandom): Random numbers for physics to use,
+                e.g., the particle system's.
+        """
+        if use_numpy is None:
+            use_numpy = numpy is not None
+        self.use_numpy = use_numpy
+        self.species = species
+        self.random = random
+        for field in self.FIELDS:
+            setattr(self, field, self._new_array([]))
+        # Set by share(); the fields are then `_views` of `_storage`
+        self._shared_memory = None
+        self._storage = None
+        self._views = ()
+        self._finalizer = None
+
+    @classmethod
+    def from_particle(cls, particle, count, use_numpy=None):
+        """Create storage of `count` copies of a particle.
+
+        Arguments:
+            particle (Particle): Particle whose attributes to copy.
+            count (int): Number of copies.
+            use_numpy (bool): Whether to use NumPy arrays; by default,
+                if NumPy is installed.
+        """
+        arrays = cls(species=particle.species, use_numpy=use_numpy)
+        for field in cls.FIELDS:
+            setattr(arrays, field,
+                    arrays._new_array([getattr(particle, field)] * count))
+        return arrays
+
+    def __len__(self):
+        return len(self.life)
+
+    def __getitem__(self, index):
+        particle = Particle(
+            self.x[index], self.y[index], self.dx[index], self.dy[index],
+            self.life[index], self.species,
+        )
+        particle.initial_life = self.initial_life[index]
+        return particle
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, particle):
+        """Add a particle.
+
+        Arguments:
+            particle (Particle): Particle whose attributes to store.
+        """
+        self.extend((particle,))
+
+    def extend(self, particles):
+        """Add many particles at once.
+
+        Arguments:
+            particles (iterable of Particle, or ParticleArrays): Particles
+                whose attributes to store.
+        """
+        if not isinstance(particles, ParticleArrays):
+            particles = list(particles)
+        if not len(particles):
+            return
+        count = len(self)
+        new_count = count + len(particles)
+        if self._storage is not None and new_count > self._storage.shape[1]:
+            self._reserve(new_count)
+        for row, field in enumerate(self.FIELDS):
+            if isinstance(particles, ParticleArrays):
+                values = getattr(particles, field)
+            else:
+                values = [getattr(particle, field) for particle in particles]
+            if self._storage is not None:
+                self._storage[row, count:new_count] = values
+            elif self.use_numpy:
+                setattr(
+                    self, field,
+                    numpy.concatenate((getattr(self, field), values)),
+                )
+            else:
+                getattr(self, field).extend(values)
+        if self._storage is not None:
+            self._set_views(new_count)
+
+    def increment(self, field, amount):
+        """Add the same amount to a field of every particle.
+
+        Arguments:
+            field (str): Name of the field, e.g., 'life'.
+            amount (float): Value to add.
+        """
+        values = getattr(self, field)
+        if self.use_numpy:
+            values += amount
+        else:
+            setattr(self, field, array('d', [
+                value + amount for value in values
+            ]))
+
+    def increment_scaled(self, field, source_field, factor):
+        """Add another field, times a factor, to a field of every
+        particle, e.g., `x += dx * dt`.
+
+        Arguments:
+            field (str): Name of the field to add to.
+            source_field (str): Name of the field to add.
+            factor (float): Value to multiply the source field by.
+        """
+        values = getattr(self, field)
+        source = getattr(self, source_field)
+        if self.use_numpy:
+            values += source * factor
+        else:
+            setattr(self, field, array('d', [
+                value + source_value * factor
+                for value, source_value in zip(values, source)
+            ]))
+
+    def increment_each(self, field, amounts):
+        """Add a different amount to a field of each particle.
+
+        Arguments:
+            field (str): Name of the field to add to.
+            amounts (sequence of float): Value to add to each particle, in
+                order.
+        """
+        values = getattr(self, field)
+        if self.use_numpy:
+            values += amounts
+        else:
+            setattr(self, field, array('d', [
+                value + amount for value, amount in zip(values, amounts)
+            ]))
+
+    def compact(self):
+        """Get rid of all no longer active particles (life <= 0)."""
+        if self.use_numpy:
+            alive = self.life > 0
+            if alive.all():
+                return
+            if self._storage is not None:
+                count = int(numpy.count_nonzero(alive))
+                for row, field in enumerate(self.FIELDS):
+                    self._storage[row, :count] = getattr(self, field)[alive]
+                self._set_views(count)
+                return
+            for field in self.FIELDS:
+                setattr(self, field, getattr(self, field)[alive])
+        else:
+            # min() is a quick check, since particles rarely die
+            if not self.life or min(self.life) > 0:
+                return
+            alive = [life > 0 for life in self.life]
+            for field in self.FIELDS:
+                setattr(self, field, array(
+                    'd', itertools.compress(getattr(self, field), alive)
+                ))
+
+    def apply(self, dt, physics):
+        """Apply physics to every particle, all at once if the physics
+        has an `apply_batch(dt, arrays)` method, otherwise one particle
+        at a time.
+
+        Arguments:
+            dt (float): Elapsed seconds.
+            physics (callable): Physics function.
+        """
+        apply_batch = getattr(physics, 'apply_batch', None)
+        if apply_batch is not None:
+            apply_batch(dt, self)
+        else:
+            self.apply_each(dt, physics)
+
+    def apply_each(self, dt, physics):
+        """Apply physics to one particle at a time, for physics which
+        can't operate on arrays.
+
+        Arguments:
+            dt (float): Elapsed seconds.
+            physics (callable): Physics function taking a time delta
+                and a particle.
+        """
+        for index in range(len(self)):
+            particle = self[index]
+            physics(dt, particle)
+            for field in self.FIELDS:
+                getattr(self, field)[index] = getattr(particle, field)
+
+    def share(self):
+        """Move the arrays into a block of shared memory, if they aren't
+        there already, so other processes can update them in place; see
+        `ParticleProcessPool`.  The block grows as particles are added,
+        and is freed along with these arrays.
+
+        Requires NumPy and Python 3.8 or later.
+
+        Returns:
+            tuple: The name of the block, and the number of particles it
+                has room for; each of the `FIELDS` is a row of that many
+                floats, in order.
+        """
+        if not self.use_numpy or shared_memory is None:
+            raise RuntimeError(
+                'Sharing particles requires NumPy and Python 3.8+'
+            )
+        if self._storage is None or len(self) > self._storage.shape[1]:
+            self._reserve(len(self))
+        else:
+            self._store()
+        return self._shared_memory.name, self._storage.shape[1]
+
+    def _reserve(self, count):
+        """Move the arrays into a new block of shared memory, with room
+        for at least `count` particles.
+        """
+        fields = len(self.FIELDS)
+        # Leave room to grow, rather than reallocating every update
+        capacity = max(count * 2, 1024)
+        block = shared_memory.SharedMemory(
+            create=True, size=fields * capacity * 8
+        )
+        old_finalizer = self._finalizer
+        self._shared_memory = block
+        self._storage = numpy.ndarray(
+            (fields, capacity), dtype=float, buffer=block.buf
+        )
+        self._finalizer = weakref.finalize(self, _free_shared_memory, block)
+        # Every field has to be copied, even views of the old block
+        self._views = ()
+        self._store()
+        if old_finalizer is not None:
+            # Frees the old block now, rather than with these arrays
+            old_finalizer()
+
+    def _store(self):
+        """Copy any arrays which aren't views of the shared memory (e.g.,
+        replaced by physics) into it.
+        """
+        count = len(self)
+        for row, field in enumerate(self.FIELDS):
+            values = getattr(self, field)
+            if row >= len(self._views) or values is not self._views[row]:
+                self._storage[row, :count] = values
+        self._set_views(count)
+
+    def _set_views(self, count):
+        self._views = tuple(self._storage[:, :count])
+        for field, view in zip(self.FIELDS, self._views):
+            setattr(self, field, view)
+
+    def _new_array(self, values):
+        if self.use_numpy:
+            return numpy.array(values, dtype=float)
+        return array('d', values)
+
+
 class EmitterComposite(object):
     """Combine several emitters into one."""
     def __init__(self, *emitters):
@@ -401,6 +1118,19 @@ class PhysicsComposite(object):
         for physics in self.physics:
             physics(dt, particle)
 
+    def apply_batch(self, dt, arrays):
+        """Do all physics updates for `dt` seconds on all particles.
+
+        Each physics function is applied to all the particles at once if
+        it supports it, otherwise one particle at a time.
+
+        Arguments:
+            dt (float): Elapsed seconds
+            arrays (ParticleArrays): Particles to update.
+        """
+        for physics in self.physics:
+            arrays.apply(dt, physics)
+
 
 class PhysicsInertia(object):
     """Perform inertia on a particle.
@@ -419,12 +1149,27 @@ class PhysicsInertia(object):
         particle.y += dt * particle.dy
         particle.life -= dt
 
+    def apply_batch(self, dt, arrays):
+        """Perform inertia updates for `dt` seconds on all particles.
+
+        Arguments:
+            dt (float): Elapsed seconds
+            arrays (ParticleArrays): Particles to update.
+        """
+        arrays.increment_scaled('x', 'dx', dt)
+        arrays.increment_scaled('y', 'dy', dt)
+        arrays.increment('life', -dt)
+
 
 class PhysicsJitter(object):
     """Add randomness to particle motion.
 
     Randomness can be applied to particle coordinates, velocity, or life,
     which is cool.
+
+    Brownian jitter of array-backed particles is drawn in bulk, from the
+    particle system's seedable `ParticleRandom`; otherwise, it's drawn one
+    number at a time from the `random` module.
     """
 
     ATTRS = 'x y dx dy life'.split()
@@ -452,6 +1197,31 @@ class PhysicsJitter(object):
     def brownian(cls, dt):
         return random.gauss(0, math.sqrt(dt))
 
+    def apply_batch(self, dt, arrays):
+        """Perform jitter for `dt` seconds on all particles.
+
+        Arguments:
+            dt (float): Elapsed seconds
+            arrays (ParticleArrays): Particles to update.
+        """
+        count = len(arrays)
+        brownian = self.jitter == self.brownian
+        for attr in self.ATTRS:
+            value = getattr(self, attr)
+            if value:
+                if brownian and arrays.random is not None:
+                    jitters = arrays.random.normal(
+                        value * math.sqrt(dt), count
+                    )
+                    arrays.increment_each(attr, jitters)
+                elif brownian and arrays.use_numpy:
+                    jitters = numpy.random.normal(0, math.sqrt(dt), count)
+                    arrays.increment_each(attr, value * jitters)
+                else:
+                    arrays.increment_each(attr, [
+                        value * self.jitter(dt) for _ in range(count)
+                    ])
+
     def __call__(self, dt, particle):
         """Perform jitter for `dt` seconds on given particle.
 
@@ -504,6 +1274,18 @@ class PhysicsKick(object):
         particle.dy += dt * self.dy
         particle.life += dt * self.life
 
+    def apply_batch(self, dt, arrays):
+        """Perform kick for `dt` seconds on all particles.
+
+        Arguments:
+            dt (float): Elapsed seconds
+            arrays (ParticleArrays): Particles to update.
+        """
+        for attr in PhysicsJitter.ATTRS:
+            value = getattr(self, attr)
+            if value:
+                arrays.increment(attr, dt * value)
+
 
 class PhysicsAcceleration(object):
     """Constant acceleration field.
@@ -546,6 +1328,16 @@ class PhysicsAcceleration(object):
         particle.dx += dt * self.ax
         particle.dy += dt * self.ay
 
+    def apply_batch(self, dt, arrays):
+        """Perform acceleration for `dt` seconds on all particles.
+
+        Arguments:
+            dt (float): Elapsed seconds
+            arrays (ParticleArrays): Particles to update.
+        """
+        arrays.increment('dx', dt * self.ax)
+        arrays.increment('dy', dt * self.ay)
+
 
 class ArtistSimple(object):
     """Artist that simply draws an image at each particle position."""
@@ -575,12 +1367,35 @@ class ArtistSimple(object):
         y = int(particle.y - self.origin[1])
         surface.blit(self.image, (x, y), special_flags=self.special_flags)
 
+    def draw_batch(self, surface, particles):
+        """Draw all given particles on given surface with one `blits` call,
+        skipping those which would be entirely off the surface.
+
+        Arguments:
+            surface (pygame.Surface): Surface to draw on
+            particles (list of Particle, or ParticleArrays): Particles to
+                draw
+        """
+        positions = visible_positions(
+            particles, self.origin, self.image.get_size(), surface
+        )
+        image = self.image
+        if self.special_flags:
+            flags = self.special_flags
+            blit_sequence = [
+                (image, position, None, flags) for position in positions
+            ]
+        else:
+            blit_sequence = [(image, position) for position in positions]
+        surface.blits(blit_sequence, doreturn=False)
+
 
 class ArtistFadeOverlay(object):
     """Artist that draws an image, fading between different tints based on
     the particle's lifetime."""
     def __init__(self, image, origin, tints,
-                 blit_flags=0, tint_flags=pygame.BLEND_RGBA_MULT):
+                 blit_flags=0, tint_flags=pygame.BLEND_RGBA_MULT,
+                 ramp_steps=64):
         """Initialize the artist.
 
         Arguments:
@@ -602,6 +1417,10 @@ class ArtistFadeOverlay(object):
             tint_flags (int): special flags determining blit mode (normal,
                 additive, subtractive, etc) the tint will be applied to
                 the image. By default this is multiplicative.
+            ramp_steps (int): Number of tinted images to render, evenly
+                spaced over the lifetime, ahead of time.  Each particle is
+                drawn with the one nearest to its life fraction, rather than
+                tinting an image for every particle every frame.
         """
         self.image = image
         try:
@@ -616,6 +1435,19 @@ class ArtistFadeOverlay(object):
         self.tints = tints
         self.blit_flags = blit_flags
         self.tint_flags = tint_flags
+        self.ramp_steps = ramp_steps
+        self.build_ramp()
+
+    def build_ramp(self):
+        """Render the tinted images.  Must be called again if the image,
+        tints, tint flags, or number of ramp steps are changed.
+        """
+        self.ramp = []
+        for step in range(self.ramp_steps):
+            overlay = self.image.copy()
+            tint = self._tint_at(step / max(self.ramp_steps - 1, 1))
+            overlay.fill(tint, special_flags=self.tint_flags)
+            self.ramp.append(overlay)
 
     def __call__(self, surface, particle):
         """Draw given particle on given surface.
@@ -624,21 +1456,73 @@ class ArtistFadeOverlay(object):
             surface (pygame.Surface): Surface to draw on
             particle (Particle): Particle to draw
         """
-        overlay = self.image.copy()
-        tint = self.calculate_tint(particle.life, particle.initial_life)
-
-        overlay.fill(tint, special_flags=self.tint_flags)
+        overlay = self.ramp[
+            self.ramp_index(particle.life, particle.initial_life)
+        ]
         x = int(particle.x - self.origin[0])
         y = int(particle.y - self.origin[1])
         surface.blit(overlay, (x, y), special_flags=self.blit_flags)
 
+    def draw_batch(self, surface, particles):
+        """Draw all given particles on given surface with one `blits` call,
+        skipping those which would be entirely off the surface.
+
+        Arguments:
+            surface (pygame.Surface): Surface to draw on
+            particles (list of Particle, or ParticleArrays): Particles to
+                draw
+        """
+        positions, indexes = visible_positions(
+            particles, self.origin, self.image.get_size(), surface,
+            return_indexes=True,
+        )
+        if isinstance(particles, ParticleArrays) and particles.use_numpy:
+            life_fractions = numpy.clip(
+                1 - particles.life[indexes] / particles.initial_life[indexes],
+                0, 1,
+            )
+            ramp_indexes = (
+                life_fractions * (self.ramp_steps - 1) + 0.5
+            ).astype(int).tolist()
+        elif isinstance(particles, ParticleArrays):
+            ramp_indexes = [
+                self.ramp_index(particles.life[index],
+                                particles.initial_life[index])
+                for index in indexes
+            ]
+        else:
+            ramp_indexes = [
+                self.ramp_index(particles[index].life,
+                                particles[index].initial_life)
+                for index in indexes
+            ]
+        ramp = self.ramp
+        flags = self.blit_flags
+        surface.blits([
+            (ramp[ramp_index], position, None, flags)
+            for ramp_index, position in zip(ramp_indexes, positions)
+        ], doreturn=False)
+
+    def ramp_index(self, life, initial_life):
+        """Get the index of the tinted image to draw a particle with."""
+        life_fraction = self._life_fraction(life, initial_life)
+        return int(life_fraction * (self.ramp_steps - 1) + 0.5)
+
     def calculate_tint(self, life, initial_life):
         """Calculate tint to apply to particle."""
+        return self._tint_at(self._life_fraction(life, initial_life))
+
+    @staticmethod
+    def _life_fraction(life, initial_life):
         life_fraction = (initial_life - life) * 1.0 / initial_life
         if life_fraction > 1:
             life_fraction = 1
         elif life_fraction < 0:
             life_fraction = 0
+        return life_fraction
+
+    def _tint_at(self, life_fraction):
+        """Calculate the tint at a fraction of the lifetime."""
         index = life_fraction * (len(self.tints) - 1)
         floor = int(index)
         remainder = index - floor
@@ -649,10 +1533,141 @@ class ArtistFadeOverlay(object):
             ])
         else:
             tint = self.tints[floor]
-        print(tint)
         return tint
 
 
+def visible_positions(particles, origin, size, surface, return_indexes=False):
+    """Get where to draw each particle which is at least partly on a
+    surface.
+
+    Arguments:
+        particles (list of Particle, or ParticleArrays): Particles to draw.
+        origin (tuple of int): Position within the particle's image of the
+            particle's position.
+        size (tuple of int): Size of the particle's image.
+        surface (pygame.Surface): Surface to be drawn on.  If it has an
+            `offset` attribute, like a `sappho.layers.LayerSurface`, it
+            covers the area from there on.
+        return_indexes (bool): Also return the index of each visible
+            particle.
+
+    Returns:
+        list of tuple of int: The topleft positions to draw the particles'
+            images at, in order.  If `return_indexes` is given, a tuple of
+            those and a sequence of the particles' indexes.
+    """
+    left, top = getattr(surface, 'offset', (0, 0))
+    surface_width, surface_height = surface.get_size()
+    # Visible if the image's topleft is within these (exclusive) bounds
+    min_x, min_y = left - size[0], top - size[1]
+    max_x, max_y = left + surface_width, top + surface_height
+
+    if isinstance(particles, ParticleArrays) and particles.use_numpy:
+        # Truncates like int()
+        xs = (particles.x - origin[0]).astype(int)
+        ys = (particles.y - origin[1]).astype(int)
+        visible = (xs > min_x) & (xs < max_x) & (ys > min_y) & (ys < max_y)
+        positions = list(zip(xs[visible].tolist(), ys[visible].tolist()))
+        if return_indexes:
+            return positions, numpy.nonzero(visible)[0]
+        return positions
+
+    if isinstance(particles, ParticleArrays):
+        coordinates = zip(particles.x, particles.y)
+    else:
+        coordinates = ((particle.x, particle.y) for particle in particles)
+    origin_x, origin_y = origin
+    positions = []
+    indexes = []
+    for index, (x, y) in enumerate(coordinates):
+        x = int(x - origin_x)
+        y = int(y - origin_y)
+        if min_x < x < max_x and min_y < y < max_y:
+            positions.append((x, y))
+            indexes.append(index)
+    if return_indexes:
+        return positions, indexes
+    return positions
+
+
+def _reset_particle(particle, origin):
+    """Reset a particle, in place, to a copy of the origin particle, like
+    `copy.copy` would make.
+    """
+    for cls in type(origin).__mro__:
+        for attr in cls.__dict__.get('__slots__', ()):
+            if hasattr(origin, attr):
+                setattr(particle, attr, getattr(origin, attr))
+    if hasattr(origin, '__dict__'):
+        particle.__dict__.update(origin.__dict__)
+
+
+def _free_shared_memory(block):
+    """Free a `ParticleArrays` block of shared memory, once the arrays are
+    done with it.
+    """
+    try:
+        block.close()
+    except BufferError:
+        # Views of it are still around; it's unmapped once they're gone
+        pass
+    block.unlink()
+
+
+def _seed_worker():
+    """Give each worker process its own random numbers, rather than the
+    same ones copied from the parent process.
+    """
+    random.seed()
+    numpy.random.seed()
+
+
+def _apply_shard(args):
+    """Apply physics to one shard of particles in shared memory, in a
+    `ParticleProcessPool` worker process.
+    """
+    name, capacity, start, stop, dt, pickled_physics, species, seed = args
+    shard = ParticleArrays(
+        species=species, use_numpy=True,
+        random=None if seed is None else ParticleRandom(seed),
+    )
+    storage = _attach_shared_memory(name, capacity)
+    views = [storage[row, start:stop]
+             for row in range(len(ParticleArrays.FIELDS))]
+    for field, view in zip(ParticleArrays.FIELDS, views):
+        # Views, so physics update the shared memory in place
+        setattr(shard, field, view)
+    shard.apply(dt, pickle.loads(pickled_physics))
+    # Physics may have replaced an array, rather than updating it in place
+    for field, view in zip(ParticleArrays.FIELDS, views):
+        values = getattr(shard, field)
+        if values is not view:
+            view[:] = values
+
+
+# Blocks of shared memory a worker process has attached, by name, with
+# the array of each, so they're only attached once.
+_attached_shared_memory = collections.OrderedDict()
+
+
+def _attach_shared_memory(name, capacity, keep=8):
+    """Get the array of a `ParticleArrays` block of shared memory, in a
+    worker process, keeping the last few blocks used attached.
+    """
+    if name in _attached_shared_memory:
+        _attached_shared_memory[name] = _attached_shared_memory.pop(name)
+        return _attached_shared_memory[name][1]
+    block = shared_memory.SharedMemory(name=name)
+    storage = numpy.ndarray(
+        (len(ParticleArrays.FIELDS), capacity), dtype=float, buffer=block.buf
+    )
+    _attached_shared_memory[name] = (block, storage)
+    while len(_attached_shared_memory) > keep:
+        old_block = _attached_shared_memory.popitem(last=False)[1][0]
+        old_block.close()
+    return storage
+
+
 def _indicates_dead_emitter(desired_particle_count):
     return desired_particle_count is None or \
         desired_particle_count == OUT_OF_PARTICLES or \
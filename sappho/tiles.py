@@ -5,7 +5,14 @@ Has impassability support.
 
 """
 
+import os
 import sys
+import json
+import heapq
+import bisect
+import weakref
+import itertools
+import collections
 import pygame
 
 import xml.etree.ElementTree as ET
@@ -13,16 +20,481 @@ import xml.etree.ElementTree as ET
 PY3 = sys.version_info[0] == 3
 range = range if PY3 else xrange
 
-# TODO: this should be configurable in the
-# tilesheet rules.
 DEFAULT_AUTOMASK_THRESHOLD = 125
 """int: The alpha threshold (0-255) which
 a pixel will be marked as NOT SET.
+
+Tiles can use a different threshold through the
+`mask_threshold` flag, see :class:`Flags`.
 """
 
+SQRT2 = 2 ** 0.5
+
 
 class Flags(object):
+    """Flags which have a meaning to Sappho.
+
+    Attributes:
+        SOLID (str): The tile is collidable, and gets a rect and mask.
+        MASK_THRESHOLD (str): Prefix of a flag which sets the alpha
+            threshold used for a solid tile's mask, instead of
+            DEFAULT_AUTOMASK_THRESHOLD, e.g., `mask_threshold:200`
+            in a rules file:
+
+                44-77=solid,mask_threshold:200
+
+        ANIMATION (str): Prefix of a flag which animates a tile,
+            in the format `animation:FIRST-LAST:DURATION`, where
+            the animation frames are the tile IDs FIRST through
+            LAST, each displayed for DURATION milliseconds. For
+            example, to animate water (tile 10) with tiles 10-13:
+
+                10=animation:10-13:150
+
+    """
+
     SOLID = "solid"
+    MASK_THRESHOLD = "mask_threshold"
+    ANIMATION = "animation"
+
+
+def mask_threshold_from_flags(flags, default=DEFAULT_AUTOMASK_THRESHOLD):
+    """Get the mask threshold set by a `mask_threshold:N` flag.
+
+    Arguments:
+        flags (set): A tile's flags.
+        default (int): Returned if no threshold flag is present.
+
+    Returns:
+        int: The alpha threshold (0-255).
+
+    Example:
+        >>> mask_threshold_from_flags(set(['solid', 'mask_threshold:200']))
+        200
+
+    """
+
+    prefix = Flags.MASK_THRESHOLD + ':'
+
+    for flag in flags:
+
+        if flag.startswith(prefix):
+
+            return int(flag[len(prefix):])
+
+    return default
+
+
+def animation_from_flags(flags):
+    """Get the animation set by an `animation:FIRST-LAST:DURATION` flag.
+
+    Arguments:
+        flags (set): A tile's flags.
+
+    Returns:
+        TileAnimation|None: None if no animation flag is present.
+
+    Example:
+        >>> animation_from_flags(set(['animation:10-13:150'])).frames
+        [(10, 150), (11, 150), (12, 150), (13, 150)]
+
+    """
+
+    prefix = Flags.ANIMATION + ':'
+
+    for flag in flags:
+
+        if flag.startswith(prefix):
+            tile_ids, duration = flag[len(prefix):].split(':')
+            first_id, last_id = tile_ids.split('-')
+            frames = [(tile_id, int(duration))
+                      for tile_id in range(int(first_id), int(last_id) + 1)]
+
+            return TileAnimation(frames)
+
+    return None
+
+
+class TileAnimation(object):
+    """A looping animation of tiles from a tilesheet, e.g.,
+    water or torches.
+
+    Attributes:
+        frames (list[tuple[int, int]]): (tile ID, duration in
+            milliseconds) for each frame of the animation.
+        total_duration (int): The duration of the entire
+            animation in milliseconds.
+
+    """
+
+    def __init__(self, frames):
+        self.frames = frames
+        self._end_times = []
+        end_time = 0
+
+        for _, duration in frames:
+            end_time += duration
+            self._end_times.append(end_time)
+
+        self.total_duration = end_time
+
+    def frame_index_at(self, animation_position):
+        """Find the frame displayed at an animation position.
+
+        Arguments:
+            animation_position (int): Milliseconds since the
+                animation started; the animation loops.
+
+        Returns:
+            int: Index of the frame in self.frames.
+
+        Example:
+            >>> TileAnimation([(4, 100), (5, 50)]).frame_index_at(260)
+            1
+
+        """
+
+        if not self.total_duration:
+
+            return 0
+
+        animation_position %= self.total_duration
+
+        return bisect.bisect_right(self._end_times, animation_position)
+
+    def __repr__(self):
+
+        return "<TileAnimation frames(%s)>" % (self.frames,)
+
+
+class TileMaskCache(object):
+    """Masks for tile images, generated once per (tilesheet,
+    tile position, threshold) and shared by every tile using
+    that graphic.
+
+    Tile images are usually subsurfaces of a tilesheet, so
+    a tile is identified by the tilesheet surface it belongs
+    to, along with its area on the tilesheet. Cached masks
+    are forgotten once their tilesheet surface is garbage
+    collected.
+
+    Warning:
+        Masks are shared, so don't modify them!
+
+    """
+
+    def __init__(self):
+        self._masks = weakref.WeakKeyDictionary()
+
+    def get(self, image, threshold, sheet_masks=None):
+        """Get the mask of a tile image, generating it if
+        it hasn't been already.
+
+        Arguments:
+            image (pygame.Surface): The tile graphic.
+            threshold (int): The alpha threshold of the mask.
+            sheet_masks (dict|None): If provided, masks are cut
+                from a mask of the entire tilesheet, rather than
+                generated per tile. This dictionary maps each
+                threshold to the mask of the entire tilesheet,
+                and is filled in as needed.
+
+        Returns:
+            pygame.mask.Mask: --
+
+        """
+
+        sheet = image.get_abs_parent()
+        key = (image.get_abs_offset(), image.get_size(), threshold)
+        masks = self._masks.setdefault(sheet, {})
+        mask = masks.get(key)
+
+        if mask is None:
+            mask = self.generate(image, threshold, sheet_masks)
+            masks[key] = mask
+
+        return mask
+
+    @staticmethod
+    def generate(image, threshold, sheet_masks=None):
+        """Generate the mask of a tile image.
+
+        Images which are fully opaque (no per-pixel alpha, nor
+        a colorkey) get a filled mask without scanning any pixels.
+
+        See :meth:`get` for the arguments.
+
+        Returns:
+            pygame.mask.Mask: --
+
+        """
+
+        mask = pygame.mask.Mask(image.get_size())
+
+        if (not image.get_flags() & pygame.SRCALPHA and
+                image.get_colorkey() is None):
+
+            mask.fill()
+
+            return mask
+
+        if sheet_masks is None:
+
+            return pygame.mask.from_surface(image, threshold)
+
+        if threshold not in sheet_masks:
+            sheet_masks[threshold] = pygame.mask.from_surface(
+                image.get_abs_parent(),
+                threshold
+            )
+
+        left, top = image.get_abs_offset()
+        mask.draw(sheet_masks[threshold], (-left, -top))
+
+        return mask
+
+
+TILE_MASKS = TileMaskCache()
+"""TileMaskCache: The mask cache shared by all tiles."""
+
+
+class TileRules(object):
+    """Flags for tile IDs, compiled from a rules file into
+    sorted, non-overlapping ranges of tile IDs.
+
+    A rule like `0-65535=solid` is stored as a single range,
+    rather than an entry per tile ID, and looking up the flags
+    of a tile ID is a binary search over the ranges.
+
+    Behaves like a (read only) dictionary whose keys are tile
+    IDs and whose values are the flags of that tile ID, e.g.,
+    `dict(tile_rules)` expands the ranges into such a dictionary.
+
+    Attributes:
+        ranges (list[tuple[int, int, frozenset]]): Sorted
+            (first_id, last_id, flags) triples, where the tile
+            IDs first_id through last_id (inclusive) have flags.
+
+    """
+
+    def __init__(self, ranges=None):
+        """Compile ranges of tile IDs, given in rule order.
+
+        Arguments:
+            ranges (iterable[tuple[int, int, iterable[str]]]):
+                (first_id, last_id, flags) triples, which may
+                overlap; where they do, the later triple wins.
+
+        """
+
+        self.ranges = self.compile_ranges(ranges or [])
+        self._first_ids = [range_[0] for range_ in self.ranges]
+
+    @staticmethod
+    def compile_ranges(ranges):
+        """Resolve overlapping ranges of tile IDs into sorted,
+        non-overlapping ranges, all at once.
+
+        Arguments:
+            ranges (iterable[tuple[int, int, iterable[str]]]):
+                (first_id, last_id, flags) triples in rule order;
+                where they overlap, the later triple wins.
+
+        Returns:
+            list[tuple[int, int, frozenset]]: See :attr:`ranges`.
+
+        """
+
+        ranges = sorted(
+            ((first_id, last_id, frozenset(flags), order)
+             for order, (first_id, last_id, flags) in enumerate(ranges)),
+            key=lambda range_: range_[0]
+        )
+
+        # Between two neighboring boundaries no range begins or
+        # ends, so the same (latest) rule covers the whole span.
+        boundaries = sorted(set(itertools.chain.from_iterable(
+            (first_id, last_id + 1) for first_id, last_id, _, _ in ranges
+        )))
+        compiled = []
+        active = []
+        next_range = 0
+
+        for start, stop in zip(boundaries, boundaries[1:]):
+
+            while (next_range < len(ranges) and
+                    ranges[next_range][0] == start):
+
+                _, last_id, flags, order = ranges[next_range]
+                heapq.heappush(active, (-order, last_id, flags))
+                next_range += 1
+
+            while active and active[0][1] < start:
+                heapq.heappop(active)
+
+            if not active:
+
+                continue
+
+            flags = active[0][2]
+
+            # Merge neighboring ranges which have the same flags,
+            # e.g., `0=solid` and `1-2=solid` become `0-2=solid`.
+            if (compiled and compiled[-1][2] == flags and
+                    compiled[-1][1] + 1 == start):
+
+                compiled[-1] = (compiled[-1][0], stop - 1, flags)
+            else:
+                compiled.append((start, stop - 1, flags))
+
+        return compiled
+
+    def set_range(self, first_id, last_id, flags):
+        """Give the tile IDs first_id through last_id (inclusive)
+        the flags specified, replacing any flags those tile IDs
+        had before.
+
+        Recompiles all of the ranges, so to set many ranges at
+        once, pass them all to :class:`TileRules` instead.
+
+        Arguments:
+            first_id (int): The first tile ID of the range.
+            last_id (int): The last tile ID of the range.
+            flags (iterable[str]): The flags to set.
+
+        """
+
+        self.ranges = self.compile_ranges(
+            self.ranges + [(first_id, last_id, flags)]
+        )
+        self._first_ids = [range_[0] for range_ in self.ranges]
+
+    def get(self, tile_id, default=None):
+        """Get the flags of a tile ID.
+
+        Arguments:
+            tile_id (int): The tile ID to lookup.
+            default: Returned if tile_id has no rules.
+
+        Returns:
+            frozenset: The flags of tile_id, if it has any rules.
+
+        """
+
+        index = bisect.bisect_right(self._first_ids, tile_id) - 1
+
+        if index >= 0 and tile_id <= self.ranges[index][1]:
+
+            return self.ranges[index][2]
+
+        return default
+
+    def has_flag(self, flag):
+        """Check if any tile ID has the specified flag.
+
+        Arguments:
+            flag (str): The flag to look for, e.g., `Flags.SOLID`.
+
+        Returns:
+            bool: True if at least one tile ID has flag.
+
+        """
+
+        return any(flag in flags for _, _, flags in self.ranges)
+
+    def __getitem__(self, tile_id):
+        flags = self.get(tile_id)
+
+        if flags is None:
+
+            raise KeyError(tile_id)
+
+        return flags
+
+    def __contains__(self, tile_id):
+
+        return self.get(tile_id) is not None
+
+    def __len__(self):
+        """Return the number of tile IDs which have rules."""
+
+        return sum(last_id - first_id + 1
+                   for first_id, last_id, _ in self.ranges)
+
+    def __iter__(self):
+        """Iterate over the tile IDs which have rules, in order."""
+
+        for first_id, last_id, _ in self.ranges:
+
+            for tile_id in range(first_id, last_id + 1):
+
+                yield tile_id
+
+    def keys(self):
+        """Get the tile IDs which have rules.
+
+        Returns:
+            iterator[int]: The tile IDs, in order.
+
+        """
+
+        return iter(self)
+
+    def values(self):
+        """Get the flags of each tile ID which has rules.
+
+        Returns:
+            iterator[frozenset]: The flags, in tile ID order.
+
+        """
+
+        return (flags for _, flags in self.items())
+
+    def items(self):
+        """Get each tile ID which has rules, and its flags.
+
+        Returns:
+            iterator[tuple[int, frozenset]]: (tile_id, flags)
+                pairs, in tile ID order.
+
+        """
+
+        for first_id, last_id, flags in self.ranges:
+
+            for tile_id in range(first_id, last_id + 1):
+
+                yield tile_id, flags
+
+    def to_json(self):
+        """Serialize the compiled ranges.
+
+        Returns:
+            str: JSON which :meth:`from_json` accepts.
+
+        """
+
+        return json.dumps([[first_id, last_id, sorted(flags)]
+                           for first_id, last_id, flags in self.ranges])
+
+    @classmethod
+    def from_json(cls, json_string):
+        """Load the compiled ranges created by :meth:`to_json`.
+
+        Arguments:
+            json_string (str): --
+
+        Returns:
+            TileRules: --
+
+        """
+
+        tile_rules = cls()
+        tile_rules.ranges = [(first_id, last_id, frozenset(flags))
+                             for first_id, last_id, flags
+                             in json.loads(json_string)]
+        tile_rules._first_ids = [range_[0] for range_ in tile_rules.ranges]
+
+        return tile_rules
 
 
 class Tile(pygame.sprite.Sprite):
@@ -42,7 +514,21 @@ class Tile(pygame.sprite.Sprite):
 
     """
 
-    def __init__(self, id_, image, flags=None):
+    def __init__(self, id_, image, flags=None, mask=None):
+        """Create a tile.
+
+        Arguments:
+            id_ (int): The ID of this tile in its tilesheet.
+            image (pygame.surface.Surface): The tile graphic.
+            flags (set): See the class attributes.
+            mask (pygame.mask.Mask): An already computed mask to
+                use for a solid tile. If not provided, the mask
+                comes from TILE_MASKS, using the threshold from
+                the `mask_threshold` flag (if any). Only used if
+                the `solid` flag was specified.
+
+        """
+
         super(Tile, self).__init__()
         self.id_ = id_
         self.image = image
@@ -50,8 +536,12 @@ class Tile(pygame.sprite.Sprite):
 
         if Flags.SOLID in self.flags:
             self.rect = self.image.get_rect()
-            self.mask = pygame.mask.from_surface(image,
-                                                 DEFAULT_AUTOMASK_THRESHOLD)
+
+            if mask is None:
+                threshold = mask_threshold_from_flags(self.flags)
+                mask = TILE_MASKS.get(image, threshold)
+
+            self.mask = mask
 
     def copy(self):
         tile = Tile(self.id_, self.image, self.flags)
@@ -73,16 +563,19 @@ class Tilesheet(object):
             Tilesheet.
         tile_size (tuple[int, int]): The size of each
             tile in pixels (x, y).
+        animations (dict[int, TileAnimation]): The animation
+            of each animated tile, by tile ID.
 
     """
 
-    def __init__(self, surface, tiles, tile_size):
+    def __init__(self, surface, tiles, tile_size, animations=None):
         self.surface = surface
         self.tiles = tiles
         self.tile_size = tile_size
+        self.animations = animations or {}
 
     @staticmethod
-    def parse_rules(path_to_rules_file):
+    def parse_rules(path_to_rules_file, use_cache=True):
         """Get properties for tile IDs from the
         path_to_rules_file.
 
@@ -93,31 +586,50 @@ class Tilesheet(object):
             10=SOMEFLAG
 
         So as you can see, you can set multiple tile's properties
-        by listing them out and using ranges of tile IDs.
+        by listing them out and using ranges of tile IDs. If a
+        tile ID is given by more than one rule, the last rule wins.
+
+        The compiled rules are cached to disk next to the rules
+        file (see :func:`rules_cache_path`), so loading the same,
+        unchanged rules file again skips the parsing.
 
         Argument:
             path_to_rules_file (str): Path to the rules file to parse
+            use_cache (bool): Whether to read and write the
+                compiled rules cache.
 
         Returns:
-            dict: You can lookup a tile by id (key) and get its
-                rules (value, set). It should look something like
+            TileRules: You can lookup a tile by id (key) and get its
+                rules (value, frozenset). It should look something like
                 this:
 
-                >>> {0: set(['solid']),
-                ...  1: set(['solid', 'foo'])}  # doctest: +SKIP
+                >>> {0: frozenset(['solid']),
+                ...  1: frozenset(['solid', 'foo'])}  # doctest: +SKIP
 
         """
 
-        tile_rules = {}
+        if use_cache:
+            tile_rules = load_rules_cache(path_to_rules_file)
+
+            if tile_rules is not None:
+
+                return tile_rules
+
+        ranges = []
 
         with open(path_to_rules_file) as f:
             rules = [line.strip() for line in f.readlines()]
 
         # For each line, basically
         for rule in rules:
+
+            if not rule:
+
+                continue
+
             tile_ids_affected, flags = rule.split('=')
             tile_ids_affected = tile_ids_affected.split(',')
-            flags = set([flag.strip() for flag in flags.split(',')])
+            flags = [flag.strip() for flag in flags.split(',')]
 
             for tile_id in tile_ids_affected:
 
@@ -128,16 +640,13 @@ class Tilesheet(object):
                     # Just one tile ID!
                     first_id = last_id = tile_id
 
-                # Create a dictionary whose keys are
-                # first_id through last_id, and values
-                # are the flags defined in the rule.
-                tile_id_range = range(int(first_id), int(last_id) + 1)
-                this_iteration_rules = dict.fromkeys(tile_id_range,
-                                                     flags)
-                # ... finally updating our overall collection
-                # of all the tile rules with the rules found
-                # this iteration!
-                tile_rules.update(this_iteration_rules)
+                ranges.append((int(first_id), int(last_id), flags))
+
+        # Resolve the overlapping rules once, rather than per rule
+        tile_rules = TileRules(ranges)
+
+        if use_cache:
+            save_rules_cache(path_to_rules_file, tile_rules)
 
         return tile_rules
 
@@ -157,26 +666,77 @@ class Tilesheet(object):
         tile_rules = cls.parse_rules(file_path + ".rules")
 
         tile_size = (tile_width, tile_height)
-        tilesheet_width, tilesheet_height = tilesheet_surface.get_size()
-        tilesheet_width_in_tiles = tilesheet_width // tile_width
-        tilesheet_height_in_tiles = tilesheet_height // tile_height
-        total_tiles = tilesheet_width_in_tiles * tilesheet_height_in_tiles
+        tile_rects = cls.tile_rects(tilesheet_surface.get_size(), tile_size)
+
+        # Scan the whole sheet for the solid tiles' masks just once
+        # per threshold, rather than once per solid tile; each tile's
+        # mask is cut out of the sheet's mask.
+        sheet_masks = {}
 
         # tile initialization; buid all the tiles
         tiles = []
+        animations = {}
+        no_flags = set([])
+
+        for tile_id, tile_rect in enumerate(tile_rects):
+            subsurface = tilesheet_surface.subsurface(tile_rect)
+            flags = tile_rules.get(tile_id, no_flags)
+
+            if Flags.SOLID in flags:
+                threshold = mask_threshold_from_flags(flags)
+                mask = TILE_MASKS.get(subsurface, threshold, sheet_masks)
+            else:
+                mask = None
+
+            animation = animation_from_flags(flags)
 
-        for tile_id in range(total_tiles):
-            subsurface = cls.tile_subsurface_from_tile_id(tilesheet_surface,
-                                                          tile_size,
-                                                          tile_id)
+            if animation is not None:
+                animations[tile_id] = animation
 
-            flags = tile_rules[tile_id] if tile_id in tile_rules else set([])
+            # The rules' flags are shared between tile IDs, so
+            # give each tile its own set to modify.
             tile = Tile(id_=tile_id,
                         image=subsurface,
-                        flags=flags)
+                        flags=set(flags),
+                        mask=mask)
             tiles.append(tile)
 
-        return Tilesheet(tilesheet_surface, tiles, tile_size)
+        return Tilesheet(tilesheet_surface, tiles, tile_size, animations)
+
+    @staticmethod
+    def tile_rects(tilesheet_size, tile_size):
+        """Compute the area of every tile on a tilesheet
+        in one pass, ordered by tile ID.
+
+        Partial tiles along the right and bottom edges of
+        the tilesheet are ignored.
+
+        Arguments:
+            tilesheet_size (tuple[int, int]): (x, y) pixel
+                dimensions of the tilesheet.
+            tile_size (tuple[int, int]): (x, y) pixel dimensions
+                of all tiles.
+
+        Returns:
+            list[pygame.Rect]: The rect on the tilesheet for
+                each tile, where the index is the tile ID.
+
+        Example:
+            >>> rects = Tilesheet.tile_rects((4, 2), (2, 1))
+            >>> [rect.topleft for rect in rects]
+            [(0, 0), (2, 0), (0, 1), (2, 1)]
+
+        """
+
+        tile_width, tile_height = tile_size
+        tilesheet_width, tilesheet_height = tilesheet_size
+        tilesheet_width_in_tiles = tilesheet_width // tile_width
+        tilesheet_height_in_tiles = tilesheet_height // tile_height
+
+        return [pygame.Rect(x * tile_width, y * tile_height,
+                            tile_width, tile_height)
+                for y in range(tilesheet_height_in_tiles)
+                for x in range(tilesheet_width_in_tiles)]
 
     @staticmethod
     def tile_subsurface_from_tile_id(tilesheet_surface, tile_size, tile_id):
@@ -194,7 +754,7 @@ class Tilesheet(object):
 
         """
 
-        tilesheet_width_in_tiles = (tilesheet_surface.get_size()[0] /
+        tilesheet_width_in_tiles = (tilesheet_surface.get_size()[0] //
                                     tile_size[0])
         top_left_in_tiles = index_to_coord(tilesheet_width_in_tiles,
                                            tile_id)
@@ -222,12 +782,44 @@ class TileMap(object):
             :class:`Tile` objects representing the tiles of
             this TileMap.
 
+    Attributes:
+        passability (PassabilityGrid): Which tiles of this TileMap
+            can be walked through, for pathfinding. Kept up to date
+            by :meth:`set_tile`.
+
     """
 
     def __init__(self, tilesheet, tiles):
         self.tilesheet = tilesheet
         self.tiles = tiles
         self.collision_group = self.set_solid_tiles_topleft(self.tiles)
+        self.passability = PassabilityGrid.from_tiles(self.tiles)
+
+    def set_tile(self, x, y, tile):
+        """Replace the tile at a position of this TileMap.
+
+        Updates the collision group and passability of
+        this TileMap, too.
+
+        Arguments:
+            x (int): Column of the tile to replace.
+            y (int): Row of the tile to replace.
+            tile (Tile): The new tile. Like the tiles of
+                :meth:`from_csv_string_and_tilesheet`, this should
+                be a copy of the tilesheet's tile.
+
+        """
+
+        self.collision_group.remove(self.tiles[y][x])
+        self.tiles[y][x] = tile
+        solid = Flags.SOLID in tile.flags
+
+        if solid:
+            tile.rect.topleft = (x * self.tilesheet.tile_size[0],
+                                 y * self.tilesheet.tile_size[1])
+            self.collision_group.add(tile)
+
+        self.passability.set_passable(x, y, not solid)
 
     def set_solid_tiles_topleft(self, tiles):
         """The rectangles from tiles do not contain positional
@@ -291,6 +883,29 @@ class TileMap(object):
 
         return new_surface
 
+    def animated_cells(self):
+        """Find the cells of this TileMap holding animated tiles.
+
+        Returns:
+            dict[int, list[tuple[int, int]]]: The pixel positions
+                (topleft) of the cells holding each animated tile ID.
+
+        """
+
+        animations = self.tilesheet.animations
+        tile_size_x, tile_size_y = self.tilesheet.tile_size
+        cells = {}
+
+        for y, row_of_tiles in enumerate(self.tiles):
+
+            for x, tile in enumerate(row_of_tiles):
+
+                if tile.id_ in animations:
+                    tile_position = (x * tile_size_x, y * tile_size_y)
+                    cells.setdefault(tile.id_, []).append(tile_position)
+
+        return cells
+
     @classmethod
     def from_csv_string_and_tilesheet(cls, csv_string, tilesheet, firstgid=0):
         """Create a tilemap using a CSV of tile IDs and
@@ -328,6 +943,489 @@ class TileMap(object):
         return cls(tilesheet, sheet)
 
 
+class PassabilityGrid(object):
+    """Which cells of a grid can be walked through, with
+    pathfinding over them.
+
+    Paths are found with A*, using Jump Point Search to skip
+    over the many cells of open areas. Movement is in eight
+    directions, but never diagonally past the corner of an
+    impassable cell.
+
+    Found paths are cached until the grid changes.
+
+    Arguments:
+        width (int): Width of the grid in cells.
+        height (int): Height of the grid in cells.
+        cells (bytearray): For each cell, row by row, 1 if
+            the cell is passable, else 0. Defaults to every
+            cell being passable.
+        max_cached_paths (int): Most paths to keep cached. The
+            least recently used paths are forgotten first. If 0,
+            no paths are cached.
+
+    """
+
+    def __init__(self, width, height, cells=None, max_cached_paths=1024):
+        self.width = width
+        self.height = height
+        self.cells = cells or bytearray([1]) * (width * height)
+        self.max_cached_paths = max_cached_paths
+        self._paths = collections.OrderedDict()
+
+        # The cells with a border of impassable cells around them,
+        # so jumping never has to check if it's left the grid.
+        row = width + 2
+        self._padded_cells = bytearray(row * (height + 2))
+
+        for y in range(height):
+            padded_start = (y + 1) * row + 1
+            self._padded_cells[padded_start:padded_start + width] = (
+                self.cells[y * width:(y + 1) * width]
+            )
+
+    @classmethod
+    def from_tiles(cls, tiles):
+        """Create the passability of a TileMap's tiles, where
+        tiles with the `solid` flag are impassable.
+
+        Arguments:
+            tiles (list[list[Tile]]): See :class:`TileMap`.
+
+        Returns:
+            PassabilityGrid: --
+
+        """
+
+        height = len(tiles)
+        width = len(tiles[0]) if tiles else 0
+        cells = bytearray(Flags.SOLID not in tile.flags
+                          for row_of_tiles in tiles
+                          for tile in row_of_tiles)
+
+        return cls(width, height, cells)
+
+    def is_passable(self, x, y):
+        """Check if a cell can be walked through. Cells
+        outside of the grid can't be.
+
+        Arguments:
+            x (int): Column of the cell.
+            y (int): Row of the cell.
+
+        Returns:
+            bool: --
+
+        """
+
+        return (0 <= x < self.width and 0 <= y < self.height and
+                self.cells[y * self.width + x] != 0)
+
+    def set_passable(self, x, y, passable):
+        """Change if a cell can be walked through, forgetting
+        the cached paths.
+
+        Arguments:
+            x (int): Column of the cell.
+            y (int): Row of the cell.
+            passable (bool): --
+
+        """
+
+        value = 1 if passable else 0
+        self.cells[y * self.width + x] = value
+        self._padded_cells[(y + 1) * (self.width + 2) + x + 1] = value
+        self._paths.clear()
+
+    def find_path(self, start, goal):
+        """Find a shortest path between two cells.
+
+        Arguments:
+            start (tuple[int, int]): (x, y) cell to start at.
+            goal (tuple[int, int]): (x, y) cell to go to.
+
+        Returns:
+            list[tuple[int, int]]|None: Every (x, y) cell along
+                the path, from start to goal (inclusive), or None
+                if there is no such path.
+
+        Example:
+            >>> grid = PassabilityGrid(3, 3, bytearray([1, 1, 1,
+            ...                                         0, 0, 1,
+            ...                                         1, 1, 1]))
+            >>> grid.find_path((0, 0), (0, 2))
+            [(0, 0), (1, 0), (2, 0), (2, 1), (2, 2), (1, 2), (0, 2)]
+
+        """
+
+        start = tuple(start)
+        goal = tuple(goal)
+        key = (start, goal)
+
+        if key in self._paths:
+            # Move this path to the end; it's the most recently used
+            path = self._paths.pop(key)
+            self._paths[key] = path
+        else:
+            path = self._search(start, goal)
+
+            if self.max_cached_paths > 0:
+
+                if len(self._paths) >= self.max_cached_paths:
+                    self._paths.popitem(last=False)
+
+                self._paths[key] = path
+
+        return None if path is None else list(path)
+
+    @staticmethod
+    def _distance(cell_a, cell_b):
+        """Octile distance; the cost of the shortest path between
+        two cells on an open grid.
+
+        """
+
+        x_distance = abs(cell_a[0] - cell_b[0])
+        y_distance = abs(cell_a[1] - cell_b[1])
+
+        return (max(x_distance, y_distance) +
+                (SQRT2 - 1) * min(x_distance, y_distance))
+
+    def _search(self, start, goal):
+        """A* over the jump points between start and goal.
+
+        Returns:
+            tuple|None: See :meth:`find_path`.
+
+        """
+
+        if not (self.is_passable(*start) and self.is_passable(*goal)):
+
+            return None
+
+        # Ties in cost are broken by insertion order, so
+        # the cells themselves are never compared.
+        counter = itertools.count()
+        open_heap = [(self._distance(start, goal), next(counter), start)]
+        costs = {start: 0}
+        parents = {start: None}
+        closed = set()
+
+        while open_heap:
+            _, _, cell = heapq.heappop(open_heap)
+
+            if cell == goal:
+
+                return self._expand_path(parents, goal)
+
+            if cell in closed:
+
+                continue
+
+            closed.add(cell)
+
+            for neighbor in self._pruned_neighbors(cell, parents[cell]):
+                x_step = _sign(neighbor[0] - cell[0])
+                y_step = _sign(neighbor[1] - cell[1])
+                jump_point = self._jump(neighbor[0], neighbor[1],
+                                        x_step, y_step, goal)
+
+                if jump_point is None or jump_point in closed:
+
+                    continue
+
+                cost = costs[cell] + self._distance(cell, jump_point)
+
+                if cost < costs.get(jump_point, float('inf')):
+                    costs[jump_point] = cost
+                    parents[jump_point] = cell
+                    estimate = cost + self._distance(jump_point, goal)
+                    heapq.heappush(open_heap,
+                                   (estimate, next(counter), jump_point))
+
+        return None
+
+    def _pruned_neighbors(self, cell, parent):
+        """The neighbors of cell worth searching, given the
+        direction it was reached from (Jump Point Search pruning).
+
+        """
+
+        x, y = cell
+        passable = self.is_passable
+
+        if parent is None:
+            neighbors = []
+
+            for x_step, y_step in ((0, -1), (1, 0), (0, 1), (-1, 0)):
+
+                if passable(x + x_step, y + y_step):
+                    neighbors.append((x + x_step, y + y_step))
+
+            for x_step, y_step in ((1, -1), (1, 1), (-1, 1), (-1, -1)):
+
+                if (passable(x + x_step, y) and passable(x, y + y_step) and
+                        passable(x + x_step, y + y_step)):
+
+                    neighbors.append((x + x_step, y + y_step))
+
+            return neighbors
+
+        x_step = _sign(x - parent[0])
+        y_step = _sign(y - parent[1])
+        neighbors = []
+
+        if x_step and y_step:
+            vertical = passable(x, y + y_step)
+            horizontal = passable(x + x_step, y)
+
+            if vertical:
+                neighbors.append((x, y + y_step))
+
+            if horizontal:
+                neighbors.append((x + x_step, y))
+
+            if vertical and horizontal and passable(x + x_step, y + y_step):
+                neighbors.append((x + x_step, y + y_step))
+
+        elif x_step:
+            ahead = passable(x + x_step, y)
+            below = passable(x, y + 1)
+            above = passable(x, y - 1)
+
+            if ahead:
+                neighbors.append((x + x_step, y))
+
+                if below and passable(x + x_step, y + 1):
+                    neighbors.append((x + x_step, y + 1))
+
+                if above and passable(x + x_step, y - 1):
+                    neighbors.append((x + x_step, y - 1))
+
+            if below:
+                neighbors.append((x, y + 1))
+
+            if above:
+                neighbors.append((x, y - 1))
+
+        else:
+            ahead = passable(x, y + y_step)
+            right = passable(x + 1, y)
+            left = passable(x - 1, y)
+
+            if ahead:
+                neighbors.append((x, y + y_step))
+
+                if right and passable(x + 1, y + y_step):
+                    neighbors.append((x + 1, y + y_step))
+
+                if left and passable(x - 1, y + y_step):
+                    neighbors.append((x - 1, y + y_step))
+
+            if right:
+                neighbors.append((x + 1, y))
+
+            if left:
+                neighbors.append((x - 1, y))
+
+        return neighbors
+
+    def _jump(self, x, y, x_step, y_step, goal):
+        """Move from (x, y) in the direction of the steps until
+        reaching a jump point: the goal, or a cell with a neighbor
+        which can only be reached optimally through that cell.
+
+        Returns:
+            tuple[int, int]|None: The jump point, or None if an
+                impassable cell is reached first.
+
+        """
+
+        row = self.width + 2
+        index = (y + 1) * row + x + 1
+        goal_index = (goal[1] + 1) * row + goal[0] + 1
+
+        if x_step and y_step:
+            index = self._jump_diagonal(self._padded_cells, index, x_step,
+                                        y_step * row, row, goal_index)
+        elif x_step:
+            index = self._jump_straight(self._padded_cells, index, x_step,
+                                        row, goal_index)
+        else:
+            index = self._jump_straight(self._padded_cells, index,
+                                        y_step * row, 1, goal_index)
+
+        if index is None:
+
+            return None
+
+        return (index % row - 1, index // row - 1)
+
+    @staticmethod
+    def _jump_straight(cells, index, step, side, goal_index):
+        """Jump horizontally or vertically over the padded cells.
+
+        Arguments:
+            step (int): Index offset to the next cell.
+            side (int): Index offset to the cells beside the path.
+
+        """
+
+        while cells[index]:
+
+            if index == goal_index:
+
+                return index
+
+            # A wall beside the path just ended, so there's a
+            # new way around it.
+            if ((cells[index - side] and not cells[index - side - step]) or
+                    (cells[index + side] and not cells[index + side - step])):
+
+                return index
+
+            index += step
+
+        return None
+
+    @classmethod
+    def _jump_diagonal(cls, cells, index, x_step, y_step, row, goal_index):
+        """Jump diagonally over the padded cells, where x_step and
+        y_step are the index offsets of moving on each axis.
+
+        """
+
+        jump_straight = cls._jump_straight
+
+        while cells[index]:
+
+            if index == goal_index:
+
+                return index
+
+            # This is a jump point if moving horizontally or
+            # vertically from here reaches one.
+            if (jump_straight(cells, index + x_step, x_step,
+                              row, goal_index) is not None or
+                    jump_straight(cells, index + y_step, y_step,
+                                  1, goal_index) is not None):
+
+                return index
+
+            # Never cut a corner
+            if not (cells[index + x_step] and cells[index + y_step]):
+
+                return None
+
+            index += x_step + y_step
+
+        return None
+
+    @staticmethod
+    def _expand_path(parents, goal):
+        """Fill in the cells between the jump points
+        leading to goal.
+
+        """
+
+        jump_points = []
+        cell = goal
+
+        while cell is not None:
+            jump_points.append(cell)
+            cell = parents[cell]
+
+        jump_points.reverse()
+        path = [jump_points[0]]
+
+        for x, y in jump_points[1:]:
+            last_x, last_y = path[-1]
+            x_step = _sign(x - last_x)
+            y_step = _sign(y - last_y)
+
+            while (last_x, last_y) != (x, y):
+                last_x += x_step
+                last_y += y_step
+                path.append((last_x, last_y))
+
+        return tuple(path)
+
+
+class AnimatedTileMapSurface(object):
+    """A TileMap rendered to a surface once, with only the cells
+    holding animated tiles blitted again as their animations
+    advance.
+
+    The cost of :meth:`update` depends on the number of animated
+    cells, not the size of the map.
+
+    Attributes:
+        tilemap (TileMap): The TileMap being rendered.
+        surface (pygame.Surface): The rendered TileMap, kept up
+            to date by :meth:`update`.
+        animation_position (int): Milliseconds elapsed since the
+            animations started.
+
+    """
+
+    def __init__(self, tilemap):
+        self.tilemap = tilemap
+        self.surface = tilemap.to_surface()
+        self.animation_position = 0
+
+        # The positions to blit each animation's frames to, along
+        # with the frame index currently rendered there.
+        animations = tilemap.tilesheet.animations
+        self._animated_cells = [
+            [animations[tile_id], positions, None]
+            for tile_id, positions in tilemap.animated_cells().items()
+        ]
+        self.update(0)
+
+    def update(self, timedelta):
+        """Advance the animations, blitting the animated cells
+        whose frame has changed.
+
+        Arguments:
+            timedelta (int|float): Milliseconds elapsed, typically
+                from the game clock via clock.get_time().
+
+        Returns:
+            list[pygame.Rect]: The areas of self.surface which
+                were changed.
+
+        """
+
+        self.animation_position += timedelta
+        tiles = self.tilemap.tilesheet.tiles
+        tile_size = self.tilemap.tilesheet.tile_size
+        changed_rects = []
+
+        for animated_cells in self._animated_cells:
+            animation, positions, rendered_frame_index = animated_cells
+            frame_index = animation.frame_index_at(self.animation_position)
+
+            if frame_index == rendered_frame_index:
+
+                continue
+
+            animated_cells[2] = frame_index
+            frame_image = tiles[animation.frames[frame_index][0]].image
+
+            for position in positions:
+                cell_rect = pygame.Rect(position, tile_size)
+                self.surface.fill((0, 0, 0, 0), cell_rect)
+                self.surface.blit(frame_image, position)
+                changed_rects.append(cell_rect)
+
+        return changed_rects
+
+
+def _sign(number):
+
+    return (number > 0) - (number < 0)
+
+
 def index_to_coord(width, i):
     """Return the 2D position (x, y) which corresponds to 1D index.
 
@@ -353,6 +1451,82 @@ def index_to_coord(width, i):
         return ((i % width), (i // width))
 
 
+def rules_cache_path(path_to_rules_file):
+    """Return the path of the compiled rules cache for a rules file.
+
+    Example:
+        >>> rules_cache_path('tilesheet.png.rules')
+        'tilesheet.png.rules.cache'
+
+    """
+
+    return path_to_rules_file + ".cache"
+
+
+def _rules_file_stamp(path_to_rules_file):
+    """The modification time and size of a rules file, which
+    is how a stale rules cache is detected.
+
+    """
+
+    stat = os.stat(path_to_rules_file)
+
+    return [stat.st_mtime, stat.st_size]
+
+
+def load_rules_cache(path_to_rules_file):
+    """Load the compiled rules for a rules file from its cache.
+
+    Arguments:
+        path_to_rules_file (str): Path to the (source) rules file.
+
+    Returns:
+        TileRules|None: None if there is no cache, or the cache is
+            out of date with the rules file.
+
+    """
+
+    try:
+
+        with open(rules_cache_path(path_to_rules_file)) as f:
+            stamp, ranges_json = f.read().split('\n', 1)
+
+        if json.loads(stamp) != _rules_file_stamp(path_to_rules_file):
+
+            return None
+
+        return TileRules.from_json(ranges_json)
+
+    except (IOError, OSError, ValueError):
+
+        return None
+
+
+def save_rules_cache(path_to_rules_file, tile_rules):
+    """Cache compiled rules next to their rules file.
+
+    Failing to write the cache (e.g., a read-only directory)
+    is not an error; the rules will simply be parsed again
+    next time.
+
+    Arguments:
+        path_to_rules_file (str): Path to the (source) rules file.
+        tile_rules (TileRules): The rules compiled from
+            path_to_rules_file.
+
+    """
+
+    try:
+        stamp = json.dumps(_rules_file_stamp(path_to_rules_file))
+
+        with open(rules_cache_path(path_to_rules_file), 'w') as f:
+            f.write(stamp + '\n' + tile_rules.to_json())
+
+    except (IOError, OSError):
+
+        pass
+
+
 def tmx_file_to_tilemaps(tmx_file_path, tilesheet):
     """Read TMX file from path and return
     a list of TileMaps (one TileMap per layer).
@@ -364,6 +1538,9 @@ def tmx_file_to_tilemaps(tmx_file_path, tilesheet):
     Returns:
         list[TileMap]: Each layer gets its own TileMap!
 
+    Any tile animations (`<animation>` elements) in the
+    tileset are added to the tilesheet's animations.
+
     Note:
         Uses CSV layers; TMX allows all kinds, but
         CSV is the default.
@@ -375,6 +1552,18 @@ def tmx_file_to_tilemaps(tmx_file_path, tilesheet):
 
     firstgid = int(root.findall(".//tileset")[0].attrib["firstgid"])
 
+    # Tiled stores tile animations in the tileset, the tile IDs
+    # of which are relative to the tileset (no firstgid).
+    for tile_element in root.findall(".//tileset/tile"):
+        frame_elements = tile_element.findall("./animation/frame")
+
+        if frame_elements:
+            frames = [(int(frame.attrib["tileid"]),
+                       int(frame.attrib["duration"]))
+                      for frame in frame_elements]
+            tile_id = int(tile_element.attrib["id"])
+            tilesheet.animations[tile_id] = TileAnimation(frames)
+
     tilemaps = []
 
     for layer_data in root.findall(".//layer/data"):
@@ -6,6 +6,8 @@ import pytest
 from sappho.camera import (Camera,
                            CameraBehavior,
                            CameraCenterBehavior,
+                           CameraSmoothBehavior,
+                           CameraSet,
                            CameraOutOfBounds)
 
 from .common import compare_surfaces
@@ -117,6 +119,58 @@ class TestCameraCenterBehavior(object):
         assert(compare_surfaces(focal_subsurface, camera))
 
 
+class TestCameraSmoothBehavior(object):
+
+    def test_movement(self):
+        behavior = CameraSmoothBehavior(smooth_time=100)
+        camera = Camera((1000, 1000), (10, 10), (10, 10), behavior=behavior)
+
+        # The first move snaps to the focal rectangle
+        camera.scroll_to(pygame.Rect(100, 100, 2, 2), 16)
+        assert camera.view_rect.center == (101, 101)
+
+        # After that, the camera eases towards it
+        focal_rectangle = pygame.Rect(200, 100, 2, 2)
+        camera.scroll_to(focal_rectangle, 16)
+        first_step = camera.view_rect.centerx
+        assert 101 < first_step < 201
+        assert camera.view_rect.centery == 101
+
+        camera.scroll_to(focal_rectangle, 16)
+        assert first_step < camera.view_rect.centerx < 201
+
+        for __ in range(100):
+            camera.scroll_to(focal_rectangle, 16)
+
+        assert camera.view_rect.center == (201, 101)
+
+        # Kept on the map
+        camera.scroll_to(pygame.Rect(0, 0, 2, 2))
+        assert camera.view_rect.topleft == (0, 0)
+
+    def test_deadzone(self):
+        behavior = CameraSmoothBehavior(smooth_time=0, deadzone=(6, 6))
+        camera = Camera((1000, 1000), (10, 10), (10, 10), behavior=behavior)
+        camera.scroll_to(pygame.Rect(100, 100, 2, 2), 16)
+
+        # Within the deadzone
+        camera.scroll_to(pygame.Rect(102, 98, 2, 2), 16)
+        assert camera.view_rect.center == (101, 101)
+
+        # Past it, the camera follows as far as the edge
+        camera.scroll_to(pygame.Rect(110, 100, 2, 2), 16)
+        assert camera.view_rect.center == (108, 101)
+
+    def test_look_ahead(self):
+        behavior = CameraSmoothBehavior(smooth_time=0, look_ahead=10)
+        camera = Camera((1000, 1000), (10, 10), (10, 10), behavior=behavior)
+        camera.scroll_to(pygame.Rect(100, 100, 2, 2), 16)
+
+        # Moving 1 pixel per millisecond
+        camera.scroll_to(pygame.Rect(116, 100, 2, 2), 16)
+        assert camera.view_rect.center == (127, 101)
+
+
 class TestCamera(object):
 
     def test_scroll(self):
@@ -167,3 +221,146 @@ class TestCamera(object):
         # Draw the to-scale camera surface to the screen mock
         mock_screen.blit(camera, (0, 0))
         assert compare_surfaces(mock_screen, red_large)
+
+    def test_skip_unchanged(self):
+        camera = Camera((2, 1), (4, 2), (1, 1))
+        camera.source_surface.fill((255, 0, 0))
+        camera.update_state(0)
+        assert camera.get_at((3, 1)) == (255, 0, 0, 255)
+
+        # Neither the view nor the source changed, so there's
+        # nothing to redraw
+        camera.source_surface.fill((0, 255, 0))
+        camera.update_state(0, source_changed=False)
+        assert camera.get_at((3, 1)) == (255, 0, 0, 255)
+
+        camera.update_state(0)
+        assert camera.get_at((3, 1)) == (0, 255, 0, 255)
+
+        # The view moved, so it's redrawn anyway
+        camera.source_surface.fill((0, 0, 255), pygame.Rect(1, 0, 1, 1))
+        camera.scroll_to(pygame.Rect(1, 0, 1, 1))
+        camera.update_state(0, source_changed=False)
+        assert camera.get_at((3, 1)) == (0, 0, 255, 255)
+
+    def test_unscaled(self):
+        camera = Camera((3, 3), (2, 2), (2, 2))
+        camera.source_surface.fill((255, 0, 0), pygame.Rect(1, 1, 1, 1))
+        camera.scroll_to(pygame.Rect(1, 1, 1, 1))
+        camera.update_state(0)
+
+        assert camera.get_at((0, 0)) == (255, 0, 0, 255)
+        assert camera.get_at((1, 1)) == (0, 0, 0, 255)
+
+    def test_integer_scaling(self):
+        camera = Camera((3, 2), (10, 5), (3, 2), integer_scaling=True)
+        camera.source_surface.fill((255, 0, 0))
+        camera.source_surface.fill((0, 255, 0), pygame.Rect(2, 1, 1, 1))
+        camera.update_state(0)
+
+        # Scaled by 2 (not stretched to 10x5), centered
+        assert camera.scale_factor == 2
+        assert camera.output_rect == pygame.Rect(2, 0, 6, 4)
+        assert camera.get_at((2, 0)) == (255, 0, 0, 255)
+        assert camera.get_at((6, 2)) == (0, 255, 0, 255)
+        assert camera.get_at((7, 3)) == (0, 255, 0, 255)
+
+        # Letterboxed
+        assert camera.get_at((1, 0)) == (0, 0, 0, 255)
+        assert camera.get_at((8, 1)) == (0, 0, 0, 255)
+        assert camera.get_at((4, 4)) == (0, 0, 0, 255)
+
+    def test_view_sized_source(self):
+        camera = Camera((100, 100), (4, 4), (2, 2), view_sized_source=True)
+        assert camera.source_surface.get_size() == (2, 2)
+
+        camera.scroll_to(pygame.Rect(50, 60, 1, 1))
+        red_rect = pygame.Rect(51, 61, 1, 1)
+        assert camera.in_view(red_rect)
+        assert not camera.in_view(pygame.Rect(10, 10, 5, 5))
+
+        camera.source_surface.fill((255, 0, 0),
+                                   camera.world_to_screen(red_rect))
+        camera.update_state(0)
+        assert camera.get_at((3, 3)) == (255, 0, 0, 255)
+        assert camera.get_at((0, 0)) == (0, 0, 0, 255)
+
+        # The view still has to be within the source resolution
+        camera.scroll_to(pygame.Rect(99, 99, 1, 1))
+
+        with pytest.raises(CameraOutOfBounds):
+            camera.update_state(0)
+
+    def test_draw_group(self):
+        camera = Camera((100, 100), (2, 2), (2, 2), view_sized_source=True)
+        camera.scroll_to(pygame.Rect(50, 50, 1, 1))
+        group = pygame.sprite.Group()
+
+        for position in ((51, 51), (10, 10), (49, 49)):
+            sprite = pygame.sprite.Sprite()
+            sprite.image = pygame.surface.Surface((2, 2))
+            sprite.image.fill((255, 0, 0))
+            sprite.rect = sprite.image.get_rect(topleft=position)
+            group.add(sprite)
+
+        visible = camera.visible(group)
+        assert sorted(sprite.rect.topleft for sprite in visible) == \
+            [(49, 49), (51, 51)]
+
+        assert len(camera.draw_group(group)) == 2
+        assert camera.source_surface.get_at((0, 0)) == (255, 0, 0, 255)
+        assert camera.source_surface.get_at((1, 1)) == (255, 0, 0, 255)
+        assert camera.source_surface.get_at((1, 0)) == (0, 0, 0, 0)
+
+
+class TestCameraSet(object):
+
+    def make_sprite(self, position, color):
+        sprite = pygame.sprite.Sprite()
+        sprite.image = pygame.surface.Surface((1, 1))
+        sprite.image.fill(color)
+        sprite.rect = sprite.image.get_rect(topleft=position)
+
+        return sprite
+
+    def test_shared_source(self):
+        viewports = CameraSet.split_viewports((4, 2), 2)
+        camera_set = CameraSet((10, 10), (4, 2), viewports, [(1, 1)] * 2)
+
+        assert len(camera_set) == 2
+        assert camera_set[0].source_surface is camera_set.source_surface
+        assert camera_set[1].source_surface is camera_set.source_surface
+
+        camera_set[1].scroll_to(pygame.Rect(5, 5, 1, 1))
+        group = pygame.sprite.Group(
+            self.make_sprite((0, 0), (255, 0, 0)),
+            self.make_sprite((5, 5), (0, 255, 0)),
+            self.make_sprite((9, 9), (0, 0, 255)),
+        )
+        assert len(camera_set.draw_group(group)) == 2
+        camera_set.update_state(0)
+
+        assert camera_set.get_at((1, 1)) == (255, 0, 0, 255)
+        assert camera_set.get_at((2, 0)) == (0, 255, 0, 255)
+
+        # Off screen, so never drawn
+        assert camera_set.source_surface.get_at((9, 9)) == (0, 0, 0, 0)
+
+    def test_view_sized_sources(self):
+        viewports = CameraSet.split_viewports((2, 4), 2, vertical=False)
+        camera_set = CameraSet((10, 10), (2, 4), viewports, [(1, 1)] * 2,
+                               view_sized_source=True)
+
+        assert camera_set.source_surface is None
+        assert camera_set[0].source_surface.get_size() == (1, 1)
+
+        camera_set[1].scroll_to(pygame.Rect(5, 5, 1, 1))
+        group = pygame.sprite.Group(
+            self.make_sprite((0, 0), (255, 0, 0)),
+            self.make_sprite((5, 5), (0, 255, 0)),
+        )
+        assert len(camera_set.draw_group(group)) == 2
+        camera_set.update_state(0)
+
+        assert camera_set.get_at((1, 1)) == (255, 0, 0, 255)
+        assert camera_set.get_at((0, 2)) == (0, 255, 0, 255)
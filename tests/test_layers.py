@@ -82,3 +82,234 @@ class TestSurfaceLayers(object):
 
         # Compare the two surfaces
         assert compare_surfaces(self.target_surface, test_surface)
+
+    def test_render_reuses_layers(self):
+        surface_layers = sappho.layers.SurfaceLayers(self.target_surface, 2)
+        layers_before = list(surface_layers)
+        surface_layers[1].fill((255, 0, 0), pygame.Rect(10, 10, 5, 5))
+        surface_layers.render()
+
+        # Same surfaces, but wiped
+        assert list(surface_layers) == layers_before
+        assert surface_layers[1].get_at((12, 12)) == (0, 0, 0, 0)
+        assert surface_layers[1].drawn_rects == []
+
+    def test_clear_drawn_only(self):
+        surface_layers = sappho.layers.SurfaceLayers(self.target_surface, 1,
+                                                     clear_drawn_only=True)
+        layer = surface_layers[0]
+
+        # Drawing behind the layer's back isn't cleared...
+        pygame.draw.rect(layer, (0, 255, 0), pygame.Rect(0, 0, 2, 2))
+
+        # ... unless it's marked as drawn
+        marked_rect = pygame.draw.rect(layer, (0, 255, 0),
+                                       pygame.Rect(50, 50, 2, 2))
+        layer.mark_drawn(marked_rect)
+        sprite = pygame.sprite.Sprite()
+        sprite.image = pygame.surface.Surface((3, 3))
+        sprite.rect = pygame.Rect(20, 20, 3, 3)
+        pygame.sprite.Group(sprite).draw(layer)
+
+        assert layer.drawn_rects == [marked_rect, sprite.rect]
+
+        surface_layers.render()
+        assert layer.get_at((0, 0)) == (0, 255, 0, 255)
+        assert layer.get_at((50, 50)) == (0, 0, 0, 0)
+        assert layer.get_at((21, 21)) == (0, 0, 0, 0)
+
+    def test_render_dirty_rects(self):
+        target_surface = pygame.surface.Surface((100, 100))
+        surface_layers = sappho.layers.SurfaceLayers(target_surface, 2,
+                                                     dirty_rects=True)
+        sprite_image = pygame.surface.Surface((10, 10))
+        sprite_image.fill((255, 0, 0))
+
+        surface_layers[1].blit(sprite_image, (10, 10))
+        assert surface_layers.render() == [pygame.Rect(10, 10, 10, 10)]
+        assert target_surface.get_at((15, 15)) == (255, 0, 0, 255)
+
+        # Outside of the dirty rects, the target isn't touched
+        target_surface.set_at((50, 50), (0, 0, 255))
+
+        # Moving the sprite updates where it was and where it is now
+        surface_layers[0].fill((0, 255, 0), pygame.Rect(0, 0, 20, 20))
+        surface_layers[1].blit(sprite_image, (15, 15))
+        assert surface_layers.render() == [pygame.Rect(0, 0, 25, 25)]
+        assert target_surface.get_at((12, 12)) == (0, 255, 0, 255)
+        assert target_surface.get_at((22, 22)) == (255, 0, 0, 255)
+        assert target_surface.get_at((50, 50)) == (0, 0, 255, 255)
+
+        # Nothing drawn this frame, only last frame's areas are updated
+        assert len(surface_layers.render()) == 1
+        assert surface_layers.render() == []
+
+    def test_render_dirty_rects_background(self):
+        target_surface = pygame.surface.Surface((100, 100))
+        surface_layers = sappho.layers.SurfaceLayers(
+            target_surface, 1, dirty_rects=True,
+            background_color=(0, 0, 255)
+        )
+        sprite_image = pygame.surface.Surface((10, 10))
+        sprite_image.fill((255, 0, 0))
+
+        # No opaque layer underneath; where the sprite was is wiped
+        surface_layers[0].blit(sprite_image, (0, 0))
+        surface_layers.render()
+        surface_layers[0].blit(sprite_image, (20, 20))
+        surface_layers.render()
+        assert target_surface.get_at((2, 2)) == (0, 0, 255, 255)
+        assert target_surface.get_at((22, 22)) == (255, 0, 0, 255)
+
+        # Only the updated areas are filled
+        assert target_surface.get_at((50, 50)) == (0, 0, 0, 255)
+
+    def test_invalidate_dirty_rects(self):
+        target_surface = pygame.surface.Surface((10, 10))
+        surface_layers = sappho.layers.SurfaceLayers(target_surface, 3,
+                                                     dirty_rects=True,
+                                                     static_layers=(0, 1))
+        surface_layers.render()
+        assert surface_layers.render() == []
+
+        # Not recorded, so only shown once the layer is invalidated
+        pygame.draw.rect(surface_layers[1], (255, 0, 0), (0, 0, 5, 5))
+        surface_layers.invalidate(1)
+        assert surface_layers.render() == [pygame.Rect(0, 0, 10, 10)]
+        assert target_surface.get_at((2, 2)) == (255, 0, 0, 255)
+
+    def test_static_layers(self):
+        target_surface = pygame.surface.Surface((10, 10))
+        surface_layers = sappho.layers.SurfaceLayers(target_surface, 3,
+                                                     static_layers=(0, 1))
+
+        # Drawn once, rendered every frame
+        surface_layers[0].fill((255, 0, 0))
+        surface_layers[1].fill((0, 255, 0), pygame.Rect(0, 0, 5, 10))
+
+        for _ in range(2):
+            surface_layers[2].fill((0, 0, 255), pygame.Rect(0, 0, 2, 2))
+            surface_layers.render()
+
+            assert target_surface.get_at((1, 1)) == (0, 0, 255, 255)
+            assert target_surface.get_at((3, 3)) == (0, 255, 0, 255)
+            assert target_surface.get_at((7, 7)) == (255, 0, 0, 255)
+
+        # Only the dynamic layer was wiped
+        assert surface_layers[1].get_at((3, 3)) == (0, 255, 0, 255)
+        assert surface_layers[2].get_at((1, 1)) == (0, 0, 0, 0)
+
+        # Drawing to a static layer updates the cached flattening
+        surface_layers[0].fill((255, 255, 255), pygame.Rect(8, 8, 2, 2))
+        surface_layers.render()
+        assert target_surface.get_at((9, 9)) == (255, 255, 255, 255)
+
+        # ... as does invalidating it after unrecorded drawing
+        pygame.draw.rect(surface_layers[1], (0, 0, 0),
+                         pygame.Rect(6, 6, 1, 1))
+        surface_layers.invalidate(1)
+        surface_layers.render()
+        assert target_surface.get_at((6, 6)) == (0, 0, 0, 255)
+
+    def test_viewport_layers(self):
+        target_surface = pygame.surface.Surface((100, 100))
+        surface_layers = sappho.layers.SurfaceLayers(target_surface, 2,
+                                                     viewport_size=(10, 10),
+                                                     margin=5,
+                                                     dirty_rects=True)
+
+        assert surface_layers[0].get_size() == (20, 20)
+
+        # The view is already covered
+        assert not surface_layers.set_view(pygame.Rect(5, 5, 10, 10))
+
+        # Moving past the margin moves the layers
+        assert surface_layers.set_view(pygame.Rect(50, 60, 10, 10))
+        assert surface_layers.offset == (45, 55)
+
+        # Drawing is in the target surface's coordinates
+        red = pygame.surface.Surface((2, 2))
+        red.fill((255, 0, 0))
+        assert surface_layers[1].blit(red, (52, 62)) == \
+            pygame.Rect(52, 62, 2, 2)
+        assert surface_layers[1].get_at((7, 7)) == (255, 0, 0, 255)
+
+        updated_rects = surface_layers.render()
+        assert pygame.Rect(45, 55, 20, 20) in updated_rects
+        assert target_surface.get_at((53, 63)) == (255, 0, 0, 255)
+
+    def test_layer_modes(self):
+        target_surface = pygame.surface.Surface((10, 10))
+        surface_layers = sappho.layers.SurfaceLayers(target_surface, 3)
+        surface_layers.set_mode(0, sappho.layers.OPAQUE)
+        surface_layers.set_mode(1, sappho.layers.COLORKEY)
+        surface_layers.set_mode(2, sappho.layers.ALPHA,
+                                special_flags=pygame.BLEND_ADD)
+
+        assert not surface_layers[0].get_flags() & pygame.SRCALPHA
+        assert surface_layers[1].get_colorkey() == (255, 0, 255, 255)
+
+        surface_layers[0].fill((100, 0, 0))
+        surface_layers[1].fill((0, 100, 0), pygame.Rect(0, 0, 5, 10))
+        surface_layers[2].fill((0, 0, 100, 255), pygame.Rect(0, 0, 10, 5))
+        surface_layers.render()
+
+        assert target_surface.get_at((7, 7)) == (100, 0, 0, 255)
+        assert target_surface.get_at((2, 7)) == (0, 100, 0, 255)
+        assert target_surface.get_at((2, 2)) == (0, 100, 100, 255)
+        assert target_surface.get_at((7, 2)) == (100, 0, 100, 255)
+
+        # Cleared to black, and transparent again
+        assert surface_layers[0].get_at((7, 7)) == (0, 0, 0, 255)
+        assert surface_layers[1].get_at((2, 7)) == (255, 0, 255, 255)
+
+
+class TestParallaxLayer(object):
+
+    def setup(self):
+        # Two columns, red then green, repeating
+        self.image = pygame.surface.Surface((2, 1))
+        self.image.set_at((0, 0), (255, 0, 0))
+        self.image.set_at((1, 0), (0, 255, 0))
+
+    def test_wrap_surface(self):
+        parallax_layer = sappho.layers.ParallaxLayer(self.image)
+        wrap_surface = parallax_layer.wrap_surface((5, 2))
+
+        assert wrap_surface.get_size() == (6, 2)
+        assert wrap_surface.get_at((4, 1)) == (255, 0, 0, 255)
+
+        # Cached
+        assert parallax_layer.wrap_surface((3, 1)) is wrap_surface
+
+    def test_draw(self):
+        parallax_layer = sappho.layers.ParallaxLayer(self.image, (0.5, 0))
+        surface = pygame.surface.Surface((20, 10))
+
+        # The view moved 6 pixels, so the texture moved 3
+        rects = parallax_layer.draw(surface, pygame.Rect(6, 2, 5, 4))
+
+        assert 1 <= len(rects) <= 4
+        assert surface.get_at((6, 2)) == (0, 255, 0, 255)
+        assert surface.get_at((7, 5)) == (255, 0, 0, 255)
+        assert surface.get_at((10, 3)) == (0, 255, 0, 255)
+
+        # Nothing outside of the view was drawn
+        assert surface.get_at((11, 2)) == (0, 0, 0, 255)
+        assert surface.get_at((6, 6)) == (0, 0, 0, 255)
+
+        covered = pygame.Rect(rects[0]).unionall(rects)
+        assert covered == pygame.Rect(6, 2, 5, 4)
+
+    def test_draw_colorkey(self):
+        self.image.set_colorkey((0, 255, 0))
+        parallax_layer = sappho.layers.ParallaxLayer(self.image, 1)
+        surface = pygame.surface.Surface((4, 2))
+        surface.fill((0, 0, 255))
+
+        parallax_layer.draw(surface, pygame.Rect(0, 0, 4, 2))
+
+        # The transparent green column leaves the blue showing through
+        assert surface.get_at((0, 0)) == (255, 0, 0, 255)
+        assert surface.get_at((1, 0)) == (0, 0, 255, 255)
+        assert surface.get_at((3, 1)) == (0, 0, 255, 255)
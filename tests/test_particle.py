@@ -1,6 +1,7 @@
 import itertools
 import unittest
 from sappho import particle
+from sappho.layers import LayerSurface
 import pygame
 from .common import compare_surfaces
 
@@ -99,6 +100,35 @@ class TestParticleSystem(unittest.TestCase):
         print(ps.particles)
         self.assertIs(p2, ps.particles[0])
 
+    def test_particles_recycled(self):
+        launched = []
+
+        def record_launch(dt, p):
+            launched.append(p)
+
+        # Particles alive for 1 second, another generated after 1.5 seconds
+        ps = particle.ParticleSystem(
+            particle.Particle(0, 0, 1, 0, 1, 'giblet'),
+            particle.EmitterBurst([(1, 0), (1, 1.5)]),
+            launcher=particle.PhysicsComposite(
+                particle.PhysicsKick(dy=2), record_launch,
+            ),
+        )
+        ps.update_state(1)
+        self.assertEquals(len(ps.particles), 0)
+        ps.update_state(0.5)
+
+        # The first particle died, and was launched again from the origin
+        self.assertEquals(len(ps.particles), 1)
+        p = ps.particles[0]
+        self.assertIs(p, launched[0])
+        self.assertIs(p, launched[1])
+        self.assertEquals(p.x, 0.5)
+        self.assertEquals(p.y, 1)
+        self.assertEquals(p.dy, 2)
+        self.assertEquals(p.life, 0.5)
+        self.assertEquals(p.initial_life, 1)
+
     def test_draw_three_particles(self):
         # start it
         artist = ArtistNull()
@@ -115,6 +145,384 @@ class TestParticleSystem(unittest.TestCase):
         self.assertEquals(artist.last_particle, ps.particles[-1])
 
 
+class TestArrayBackedParticleSystem(unittest.TestCase):
+    def test_particle_death(self):
+        # Particles alive for 3 seconds, one generated every two seconds
+        ps = particle.ParticleSystem(
+            particle.Particle(0, -1, 1, 0, 3, 'giblet'),
+            particle.EmitterBurst.repeat(1, 2),
+            array_backed=True,
+        )
+        self.assertIsInstance(ps.particles, particle.ParticleArrays)
+        ps.update_state(1)
+        self.assertEquals(len(ps.particles), 1)
+        ps.update_state(1)
+        self.assertEquals(len(ps.particles), 2)
+        ps.update_state(1)
+        self.assertEquals(len(ps.particles), 1)
+
+        # The first particle died; the second has lived for two seconds
+        p = ps.particles[0]
+        self.assertEquals(p.x, 2)
+        self.assertEquals(p.y, -1)
+        self.assertEquals(p.life, 1)
+        self.assertEquals(p.initial_life, 3)
+        self.assertEquals(p.species, 'giblet')
+
+    def test_launcher(self):
+        ps = particle.ParticleSystem(
+            particle.Particle(0, 0, 1, 0, 3),
+            particle.EmitterBurst.single(2),
+            launcher=particle.PhysicsComposite(
+                particle.PhysicsKick(dy=2, life=1),
+                particle.PhysicsJitter(x=1, jitter=lambda dt: dt),
+            ),
+            array_backed=True,
+        )
+        ps.update_state(1)
+        self.assertEquals(list(ps.particles.x), [2, 2])
+        self.assertEquals(list(ps.particles.y), [2, 2])
+        self.assertEquals(list(ps.particles.life), [3, 3])
+        self.assertEquals(list(ps.particles.initial_life), [4, 4])
+
+    def test_draw_three_particles(self):
+        artist = ArtistNull()
+        ps = particle.ParticleSystem(
+            particle.Particle(0, -1, 1, 0, 3, 'giblet'),
+            particle.EmitterBurst.single(3),
+            artist=artist,
+            array_backed=True,
+        )
+        ps.update_state(1)
+        ps.draw_on(None)
+
+        self.assertEquals(artist.count, 3)
+        self.assertEquals(artist.last_particle.x, 1)
+
+    def make_seeded_system(self, seed):
+        return particle.ParticleSystem(
+            particle.Particle(0, 0, 0, 0, 5),
+            particle.EmitterBurst.single(10),
+            launcher=particle.PhysicsJitter(dx=1, dy=1),
+            physics=particle.PhysicsComposite(
+                particle.PhysicsInertia(),
+                particle.PhysicsJitter(x=1, y=1),
+            ),
+            array_backed=True,
+            seed=seed,
+        )
+
+    def test_seed(self):
+        systems = [self.make_seeded_system(seed) for seed in (1, 1, 2)]
+        for _ in range(3):
+            for ps in systems:
+                ps.update_state(0.5)
+
+        same, also_same, different = [list(ps.particles.x) for ps in systems]
+        self.assertEquals(same, also_same)
+        self.assertNotEqual(same, different)
+
+    def test_seed_requires_arrays(self):
+        with self.assertRaises(ValueError):
+            particle.ParticleSystem(
+                particle.Particle(0, 0),
+                particle.EmitterBurst.single(1),
+                seed=1,
+            )
+
+
+class TestParticleManager(unittest.TestCase):
+    def make_system(self, x, count, life=3, artist=None):
+        return particle.ParticleSystem(
+            particle.Particle(x, 0, 0, 0, life),
+            particle.EmitterBurst.single(count),
+            artist=artist or ArtistNull(),
+        )
+
+    def test_dead_systems_removed(self):
+        manager = particle.ParticleManager().add(
+            self.make_system(0, 1, life=1),
+            self.make_system(0, 1, life=3),
+        )
+        manager.update_state(1)
+        self.assertEquals(len(manager), 2)
+        manager.update_state(1)
+        self.assertEquals(len(manager), 1)
+        manager.update_state(1)
+        self.assertEquals(len(manager), 0)
+
+    def test_particle_budget(self):
+        manager = particle.ParticleManager(particle_budget=5).add(
+            self.make_system(0, 4),
+            self.make_system(0, 4),
+        )
+        manager.update_state(1)
+        self.assertEquals(manager.particle_count(), 5)
+        self.assertEquals(
+            sorted(len(system.particles) for system in manager), [1, 4]
+        )
+
+    def test_bounds(self):
+        block = pygame.surface.Surface((2, 4))
+        system = self.make_system(10, 1, artist=particle.ArtistSimple(block))
+        self.assertEquals(system.bounds(), None)
+        system.update_state(1)
+        self.assertEquals(system.bounds(), (9, -2, 11, 2))
+
+    def test_draw_culled(self):
+        on_screen = ArtistNull()
+        off_screen = ArtistNull()
+        manager = particle.ParticleManager().add(
+            self.make_system(5, 1, artist=on_screen),
+            self.make_system(50, 1, artist=off_screen),
+        )
+        manager.update_state(1)
+        manager.draw_on(None, pygame.Rect(0, -5, 10, 10))
+        self.assertEquals(on_screen.count, 1)
+        self.assertEquals(off_screen.count, 0)
+
+
+def double_x(dt, p):
+    # Module level, so it can be sent to other processes
+    p.x *= 2
+
+
+class ShiftX(object):
+    """Batch physics replacing an array, rather than updating it in place.
+    Module level, so it can be sent to other processes.
+    """
+    def __call__(self, dt, p):
+        p.x += 1
+
+    def apply_batch(self, dt, arrays):
+        arrays.x = arrays.x + 1
+
+
+@unittest.skipIf(
+    particle.numpy is None or particle.shared_memory is None,
+    'NumPy or multiprocessing.shared_memory is not available'
+)
+class TestParticleProcessPool(unittest.TestCase):
+    def make_system(self, process_pool=None, physics=None):
+        return particle.ParticleSystem(
+            particle.Particle(0, 0, 1, 2, 5),
+            particle.EmitterBurst.single(100),
+            launcher=particle.PhysicsKick(dx=1),
+            physics=physics or particle.PhysicsComposite(
+                particle.PhysicsInertia(),
+                particle.PhysicsAcceleration(3, 0),
+                double_x,
+            ),
+            array_backed=True,
+            process_pool=process_pool,
+        )
+
+    def check_same_as_serial(self, physics=None):
+        serial = self.make_system(physics=physics)
+        with particle.ParticleProcessPool(2, min_shard_size=10) as pool:
+            parallel = self.make_system(pool, physics)
+            for _ in range(3):
+                serial.update_state(0.5)
+                parallel.update_state(0.5)
+
+        for field in particle.ParticleArrays.FIELDS:
+            self.assertEquals(
+                list(getattr(parallel.particles, field)),
+                list(getattr(serial.particles, field)),
+            )
+
+    def test_same_as_serial(self):
+        self.check_same_as_serial()
+
+    def test_replaced_arrays(self):
+        self.check_same_as_serial(ShiftX())
+
+    def test_seed(self):
+        results = []
+        for _ in range(2):
+            with particle.ParticleProcessPool(2, min_shard_size=10) as pool:
+                ps = particle.ParticleSystem(
+                    particle.Particle(0, 0, 0, 0, 5),
+                    particle.EmitterBurst.single(100),
+                    physics=particle.PhysicsJitter(x=1),
+                    array_backed=True,
+                    process_pool=pool,
+                    seed=3,
+                )
+                ps.update_state(0.5)
+                results.append(list(ps.particles.x))
+        self.assertEquals(results[0], results[1])
+
+    def test_requires_arrays(self):
+        with particle.ParticleProcessPool(2) as pool:
+            with self.assertRaises(ValueError):
+                particle.ParticleSystem(
+                    particle.Particle(0, 0),
+                    particle.EmitterBurst.single(1),
+                    process_pool=pool,
+                )
+
+
+class TestParticleRandom(unittest.TestCase):
+    def check_random(self, use_numpy):
+        streams = [
+            particle.ParticleRandom(seed, use_numpy=use_numpy)
+            for seed in (1, 1, 2)
+        ]
+        same, also_same, different = [
+            list(stream.normal(2, 100)) for stream in streams
+        ]
+        self.assertEquals(len(same), 100)
+        self.assertEquals(same, also_same)
+        self.assertNotEqual(same, different)
+        self.assertEquals(streams[0].seed_value(), streams[1].seed_value())
+
+        # Negative scales, e.g., from negative jitter factors, are fine
+        self.assertEquals(len(streams[0].normal(-1, 10)), 10)
+
+    def test_table(self):
+        self.check_random(use_numpy=False)
+
+        # Requests larger than the table wrap around it
+        stream = particle.ParticleRandom(1, table_size=10, use_numpy=False)
+        samples = stream.normal(1, 25)
+        self.assertEquals(samples[:5], samples[10:15])
+
+    @unittest.skipIf(particle.numpy is None, 'NumPy is not installed')
+    def test_numpy(self):
+        self.check_random(use_numpy=True)
+
+
+class TestParticleArrays(unittest.TestCase):
+    def check_arrays(self, use_numpy):
+        arrays = particle.ParticleArrays(use_numpy=use_numpy)
+        arrays.extend([
+            particle.Particle(0, 0, 1, 2, life=1),
+            particle.Particle(5, 5, 0, 0, life=3),
+        ])
+        arrays.increment_scaled('x', 'dx', 2)
+        arrays.increment_scaled('y', 'dy', 2)
+        arrays.increment('life', -2)
+        self.assertEquals(list(arrays.x), [2, 5])
+        self.assertEquals(list(arrays.y), [4, 5])
+
+        # Physics without apply_batch are applied one particle at a time
+        arrays.apply(1, particle.PhysicsKick(x=10))
+        self.assertEquals(list(arrays.x), [12, 15])
+
+        arrays.compact()
+        self.assertEquals(len(arrays), 1)
+        self.assertEquals(list(arrays.x), [15])
+        self.assertEquals(list(arrays.initial_life), [3])
+
+    def test_array(self):
+        self.check_arrays(use_numpy=False)
+
+    @unittest.skipIf(particle.numpy is None, 'NumPy is not installed')
+    def test_numpy(self):
+        self.check_arrays(use_numpy=True)
+
+    @unittest.skipIf(
+        particle.numpy is None or particle.shared_memory is None,
+        'NumPy or multiprocessing.shared_memory is not available'
+    )
+    def test_share(self):
+        arrays = particle.ParticleArrays(use_numpy=True)
+        arrays.extend([particle.Particle(x, 0, life=x) for x in range(3)])
+        name, capacity = arrays.share()
+
+        # The particles stay in shared memory as they're added and removed
+        arrays.compact()
+        arrays.append(particle.Particle(3, 0, life=1))
+        arrays.x *= 2
+        self.assertEquals(arrays.share(), (name, capacity))
+
+        # Arrays replaced, rather than updated in place, are copied back
+        arrays.y = arrays.y + 1
+        arrays.share()
+
+        block = particle.shared_memory.SharedMemory(name=name)
+        shared = particle.numpy.ndarray(
+            (len(particle.ParticleArrays.FIELDS), capacity),
+            dtype=float, buffer=block.buf
+        )
+        self.assertEquals(list(shared[0, :3]), [2, 4, 6])
+        self.assertEquals(list(shared[1, :3]), [1, 1, 1])
+        del shared
+        block.close()
+
+        # Growing past the block moves the particles to a bigger one
+        arrays.extend([particle.Particle(0, 0, life=1)] * capacity)
+        new_name, new_capacity = arrays.share()
+        self.assertNotEqual(new_name, name)
+        self.assertTrue(new_capacity > capacity)
+        self.assertEquals(list(arrays.x[:4]), [2, 4, 6, 0])
+
+
+class TestPhysicsBatch(unittest.TestCase):
+    """Applying physics to ParticleArrays all at once should do the same
+    as applying it to each particle.
+
+    """
+    def check_batch(self, physics, use_numpy=False):
+        particles = [
+            particle.Particle(0, 1, 2, 3, life=4),
+            particle.Particle(-5, 6, -7, 8, life=9),
+        ]
+        arrays = particle.ParticleArrays(use_numpy=use_numpy)
+        arrays.extend(particles)
+        physics.apply_batch(0.5, arrays)
+        for p in particles:
+            physics(0.5, p)
+
+        for index, p in enumerate(particles):
+            batch_particle = arrays[index]
+            for field in particle.ParticleArrays.FIELDS:
+                self.assertAlmostEqual(
+                    getattr(batch_particle, field), getattr(p, field)
+                )
+
+    def test_inertia(self):
+        self.check_batch(particle.PhysicsInertia())
+
+    def test_kick(self):
+        self.check_batch(particle.PhysicsKick(x=1, dy=-2, life=3))
+
+    def test_acceleration(self):
+        self.check_batch(particle.PhysicsAcceleration(3, -4))
+
+    def test_jitter(self):
+        self.check_batch(
+            particle.PhysicsJitter(x=2, dy=3, jitter=lambda dt: dt)
+        )
+
+    def test_composite_with_custom_physics(self):
+        def custom_physics(dt, p):
+            p.x *= 2
+
+        self.check_batch(particle.PhysicsComposite(
+            particle.PhysicsKick(x=1),
+            custom_physics,
+            particle.PhysicsInertia(),
+        ))
+
+    @unittest.skipIf(particle.numpy is None, 'NumPy is not installed')
+    def test_numpy(self):
+        self.check_batch(particle.PhysicsComposite(
+            particle.PhysicsKick(x=1, dy=-2, life=3),
+            particle.PhysicsAcceleration(3, -4),
+            particle.PhysicsInertia(),
+        ), use_numpy=True)
+
+    @unittest.skipIf(particle.numpy is None, 'NumPy is not installed')
+    def test_numpy_brownian(self):
+        arrays = particle.ParticleArrays(use_numpy=True)
+        arrays.extend([particle.Particle(0, 0)] * 100)
+        particle.PhysicsJitter(x=1).apply_batch(1, arrays)
+        self.assertEquals(len(set(arrays.x)), 100)
+        self.assertEquals(set(arrays.y), set([0]))
+
+
 class TestEmitterConstantRate(unittest.TestCase):
     def test_emitter(self):
         emitter = particle.EmitterConstantRate(10)
@@ -369,6 +777,47 @@ class TestArtistSimple(unittest.TestCase):
         assert(compare_surfaces(desired_world, world))
 
 
+class TestVisiblePositions(unittest.TestCase):
+    def setUp(self):
+        # On the surface, partly on it, and off it (by a pixel)
+        self.particles = [
+            particle.Particle(1.5, 1.5),
+            particle.Particle(-0.5, 4.5),
+            particle.Particle(-1, 0),
+            particle.Particle(0, 5),
+        ]
+        self.surface = pygame.surface.Surface((4, 4))
+
+    def test_particles(self):
+        positions = particle.visible_positions(
+            self.particles, (1, 1), (2, 2), self.surface
+        )
+        self.assertEquals(positions, [(0, 0), (-1, 3)])
+
+    def check_arrays(self, use_numpy):
+        arrays = particle.ParticleArrays(use_numpy=use_numpy)
+        arrays.extend(self.particles)
+        positions = particle.visible_positions(
+            arrays, (1, 1), (2, 2), self.surface
+        )
+        self.assertEquals(positions, [(0, 0), (-1, 3)])
+
+    def test_array(self):
+        self.check_arrays(use_numpy=False)
+
+    @unittest.skipIf(particle.numpy is None, 'NumPy is not installed')
+    def test_numpy(self):
+        self.check_arrays(use_numpy=True)
+
+    def test_offset_surface(self):
+        surface = LayerSurface((4, 4), offset=(10, 10))
+        positions = particle.visible_positions(
+            self.particles + [particle.Particle(13, 13)],
+            (1, 1), (2, 2), surface
+        )
+        self.assertEquals(positions, [(12, 12)])
+
+
 class TestArtistFadeOverlay(unittest.TestCase):
     def test_artist_draw_origin(self):
         block = pygame.surface.Surface((2, 2))
@@ -439,6 +888,53 @@ class TestArtistFadeOverlay(unittest.TestCase):
         high_life_tint = artist.calculate_tint(10.5, 10)
         self.assertEquals(high_life_tint, (10, 10, 10, 255))
 
+    def test_ramp(self):
+        block = pygame.surface.Surface((1, 1), pygame.SRCALPHA)
+        block.fill((255, 255, 255, 255))
+
+        artist = particle.ArtistFadeOverlay(
+            block, (0, 0),
+            [(200, 0, 0, 255), (0, 0, 200, 255)],
+            ramp_steps=5,
+        )
+        self.assertEquals(len(artist.ramp), 5)
+        self.assertEquals(artist.ramp_index(10, 10), 0)
+        self.assertEquals(artist.ramp_index(5.5, 10), 2)
+        self.assertEquals(artist.ramp_index(-1, 10), 4)
+        self.assertEquals(artist.ramp[0].get_at((0, 0)), (200, 0, 0, 255))
+        self.assertEquals(artist.ramp[2].get_at((0, 0)), (100, 0, 100, 255))
+        self.assertEquals(artist.ramp[4].get_at((0, 0)), (0, 0, 200, 255))
+
+    def check_draw_batch(self, array_backed):
+        block = pygame.surface.Surface((1, 1), pygame.SRCALPHA)
+        block.fill((255, 255, 255, 255))
+
+        ps = particle.ParticleSystem(
+            particle.Particle(0, 0, 1, 0, 4),
+            particle.EmitterBurst.repeat(1, 1),
+            artist=particle.ArtistFadeOverlay(
+                block, (0, 0),
+                [(200, 0, 0, 255), (0, 0, 200, 255)],
+                ramp_steps=5,
+            ),
+            array_backed=array_backed,
+        )
+        world = pygame.surface.Surface((4, 1))
+        ps.update_state(1)
+        ps.update_state(1)
+        ps.draw_on(world)
+
+        # Older particles are further along, and further along the ramp
+        self.assertEquals(world.get_at((0, 0)), (0, 0, 0, 255))
+        self.assertEquals(world.get_at((1, 0)), (150, 0, 50, 255))
+        self.assertEquals(world.get_at((2, 0)), (100, 0, 100, 255))
+
+    def test_draw_batch(self):
+        self.check_draw_batch(array_backed=False)
+
+    def test_draw_batch_array_backed(self):
+        self.check_draw_batch(array_backed=True)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -18,6 +18,33 @@ class TestTile(object):
         assert(len(tile.flags) == 0)
         assert(isinstance(tile.flags, set))
 
+    def test_mask_cache(self):
+        sheet = pygame.surface.Surface((2, 1), pygame.SRCALPHA, 32)
+        sheet.fill((255, 0, 0, 255), pygame.Rect(0, 0, 1, 1))
+        sheet.fill((255, 0, 0, 100), pygame.Rect(1, 0, 1, 1))
+        image = sheet.subsurface(pygame.Rect(1, 0, 1, 1))
+        flags = set([sappho.tiles.Flags.SOLID])
+
+        tile = sappho.tiles.Tile(1, image, flags)
+        same_tile = sappho.tiles.Tile(1, sheet.subsurface((1, 0, 1, 1)),
+                                      set(flags))
+
+        # Alpha of 100 is below the default threshold
+        assert(tile.mask.count() == 0)
+        assert(tile.mask is same_tile.mask)
+
+        # ... but not below a threshold of 50
+        low_flags = flags | set(["mask_threshold:50"])
+        low_tile = sappho.tiles.Tile(1, image, low_flags)
+        assert(low_tile.mask.count() == 1)
+
+    def test_opaque_mask(self):
+        surface = pygame.surface.Surface((3, 2))
+        tile = sappho.tiles.Tile(0, surface,
+                                 set([sappho.tiles.Flags.SOLID]))
+
+        assert(tile.mask.count() == 6)
+
 
 class TestTilesheet(object):
     def test_from_file(self):
@@ -54,6 +81,33 @@ class TestTilesheet(object):
 
         assert(compare_surfaces(target_surface, master_surface))
 
+    def test_tile_rects(self):
+        rects = sappho.tiles.Tilesheet.tile_rects((7, 4), (2, 2))
+
+        # Partial tiles on the right edge are ignored
+        assert(len(rects) == 6)
+        assert(rects[4] == pygame.Rect(2, 2, 2, 2))
+
+    def test_masks_cut_from_sheet(self):
+        testpath = os.path.realpath(__file__)
+        path = os.path.abspath(os.path.join(testpath,
+                                            "..",
+                                            "resources",
+                                            "tilesheet.png"))
+
+        tilesheet = sappho.tiles.Tilesheet.from_file(path, 1, 1)
+
+        # Each solid tile's mask should match one made from its own image
+        for tile in tilesheet.tiles:
+
+            if sappho.tiles.Flags.SOLID in tile.flags:
+                expected = pygame.mask.from_surface(
+                    tile.image,
+                    sappho.tiles.DEFAULT_AUTOMASK_THRESHOLD
+                )
+                assert(tile.mask.get_size() == expected.get_size())
+                assert(tile.mask.count() == expected.count())
+
     def test_parse_rules(self):
         testpath = os.path.realpath(__file__)
         path = os.path.abspath(os.path.join(testpath,
@@ -70,6 +124,122 @@ class TestTilesheet(object):
         assert(rules[4] == set([sappho.tiles.Flags.SOLID]))
 
 
+class TestTileRules(object):
+    def test_ranges_compressed(self):
+        rules = sappho.tiles.TileRules()
+        rules.set_range(0, 0, ["solid"])
+        rules.set_range(1, 65535, ["solid"])
+
+        assert(rules.ranges == [(0, 65535, frozenset(["solid"]))])
+        assert(len(rules) == 65536)
+        assert(rules[40000] == set(["solid"]))
+        assert(65536 not in rules)
+
+    def test_later_rule_wins(self):
+        rules = sappho.tiles.TileRules()
+        rules.set_range(0, 9, ["solid"])
+        rules.set_range(3, 5, ["foo"])
+
+        assert(rules[2] == set(["solid"]))
+        assert(rules[4] == set(["foo"]))
+        assert(rules[6] == set(["solid"]))
+        assert(len(rules.ranges) == 3)
+
+    def test_dict_like(self):
+        rules = sappho.tiles.TileRules([(0, 2, ["solid"]), (5, 5, ["foo"])])
+        solid = frozenset(["solid"])
+        foo = frozenset(["foo"])
+
+        assert(list(rules) == [0, 1, 2, 5])
+        assert(list(rules.keys()) == [0, 1, 2, 5])
+        assert(list(rules.values()) == [solid, solid, solid, foo])
+        assert(dict(rules) == {0: solid, 1: solid, 2: solid, 5: foo})
+        assert(dict(rules.items()) == dict(rules))
+
+    def test_overlapping_ranges(self):
+        rules = sappho.tiles.TileRules([(0, 9, ["solid"]),
+                                        (3, 5, ["foo"]),
+                                        (5, 12, ["bar"]),
+                                        (20, 20, ["solid"]),
+                                        (4, 4, ["solid"])])
+
+        assert(rules.ranges == [(0, 2, frozenset(["solid"])),
+                                (3, 3, frozenset(["foo"])),
+                                (4, 4, frozenset(["solid"])),
+                                (5, 12, frozenset(["bar"])),
+                                (20, 20, frozenset(["solid"]))])
+
+    def test_cache(self, tmpdir):
+        rules_path = str(tmpdir.join("tilesheet.png.rules"))
+
+        with open(rules_path, "w") as f:
+            f.write("0-99=solid\n7=foo,solid\n")
+
+        rules = sappho.tiles.Tilesheet.parse_rules(rules_path)
+        assert(os.path.exists(sappho.tiles.rules_cache_path(rules_path)))
+
+        cached_rules = sappho.tiles.load_rules_cache(rules_path)
+        assert(cached_rules.ranges == rules.ranges)
+        assert(cached_rules[7] == set(["foo", "solid"]))
+
+        # Changing the rules file makes the cache stale
+        with open(rules_path, "w") as f:
+            f.write("0=foo\n")
+
+        assert(sappho.tiles.load_rules_cache(rules_path) is None)
+        assert(sappho.tiles.Tilesheet.parse_rules(rules_path)[0] ==
+               set(["foo"]))
+
+
+class TestPassabilityGrid(object):
+    # 5x5, with a wall down the middle that has a gap at the bottom
+    CELLS = bytearray([1, 1, 0, 1, 1,
+                       1, 1, 0, 1, 1,
+                       1, 1, 0, 1, 1,
+                       1, 1, 0, 1, 1,
+                       1, 1, 1, 1, 1])
+
+    def test_find_path(self):
+        grid = sappho.tiles.PassabilityGrid(5, 5, bytearray(self.CELLS))
+        path = grid.find_path((0, 0), (4, 0))
+
+        assert(path[0] == (0, 0))
+        assert(path[-1] == (4, 0))
+        assert((2, 4) in path)
+
+        # Each step moves to a neighboring, passable cell
+        for (x, y), (next_x, next_y) in zip(path, path[1:]):
+            assert(max(abs(next_x - x), abs(next_y - y)) == 1)
+            assert(grid.is_passable(next_x, next_y))
+
+        # Shortest is 4 steps down, 4 across (diagonally) and 4 up
+        assert(len(path) == 11)
+
+    def test_no_path(self):
+        grid = sappho.tiles.PassabilityGrid(5, 5, bytearray(self.CELLS))
+        grid.set_passable(2, 4, False)
+
+        assert(grid.find_path((0, 0), (4, 0)) is None)
+        assert(grid.find_path((0, 0), (2, 0)) is None)
+
+    def test_cache_invalidated(self):
+        grid = sappho.tiles.PassabilityGrid(5, 5, bytearray(self.CELLS))
+
+        assert(len(grid.find_path((0, 0), (4, 0))) == 11)
+
+        # Open the wall at the top
+        grid.set_passable(2, 0, True)
+        assert(grid.find_path((0, 0), (4, 0)) ==
+               [(0, 0), (1, 0), (2, 0), (3, 0), (4, 0)])
+
+    def test_no_cache(self):
+        grid = sappho.tiles.PassabilityGrid(5, 5, bytearray(self.CELLS),
+                                            max_cached_paths=0)
+
+        assert(len(grid.find_path((0, 0), (4, 0))) == 11)
+        assert(len(grid.find_path((0, 0), (4, 0))) == 11)
+
+
 class TestTilemap(object):
     TILEMAP_CSV = """
     0,1,2
@@ -129,3 +299,70 @@ class TestTilemap(object):
 
         # Compare the two surfaces
         assert(compare_surfaces(test_surface, output_surface))
+
+    def test_animated_surface(self):
+        csv = textwrap.dedent(self.TILEMAP_CSV).strip()
+        tilemap = (sappho.tiles.TileMap.
+                   from_csv_string_and_tilesheet(csv, self.tilesheet))
+
+        # Tile 1 (green) animates to tile 2 (blue) and back
+        animation = sappho.tiles.TileAnimation([(1, 100), (2, 100)])
+        self.tilesheet.animations[1] = animation
+        animated = sappho.tiles.AnimatedTileMapSurface(tilemap)
+
+        assert(animated.surface.get_at((1, 0)) == (0, 255, 0, 255))
+
+        # Nothing to redraw until the frame changes
+        assert(animated.update(50) == [])
+
+        changed_rects = animated.update(50)
+        assert(changed_rects == [pygame.Rect(1, 0, 1, 1)])
+        assert(animated.surface.get_at((1, 0)) == (0, 0, 255, 255))
+
+        # The rest of the map is untouched
+        assert(animated.surface.get_at((1, 1)) == (0, 255, 0, 255))
+
+        animated.update(100)
+        assert(animated.surface.get_at((1, 0)) == (0, 255, 0, 255))
+
+    def test_tmx_animation(self, tmpdir):
+        testpath = os.path.realpath(__file__)
+        path = os.path.abspath(os.path.join(testpath,
+                                            "..",
+                                            "resources",
+                                            "tilemap.tmx"))
+
+        with open(path) as f:
+            tmx = f.read()
+
+        animation = textwrap.dedent("""
+          <tile id="3">
+           <animation>
+            <frame tileid="3" duration="100"/>
+            <frame tileid="4" duration="200"/>
+           </animation>
+          </tile>
+         </tileset>""")
+        tmx_path = str(tmpdir.join("animated.tmx"))
+
+        with open(tmx_path, "w") as f:
+            f.write(tmx.replace("</tileset>", animation))
+
+        sappho.tiles.tmx_file_to_tilemaps(tmx_path, self.tilesheet)
+
+        frames = self.tilesheet.animations[3].frames
+        assert(frames == [(3, 100), (4, 200)])
+
+    def test_passability(self):
+        csv = textwrap.dedent(self.TILEMAP_CSV).strip()
+        tilemap = (sappho.tiles.TileMap.
+                   from_csv_string_and_tilesheet(csv, self.tilesheet))
+
+        # Tiles 0-4 are solid, 5 isn't
+        assert(tilemap.passability.cells == bytearray([0, 0, 0, 1, 0, 0]))
+        assert(tilemap.passability.find_path((0, 1), (1, 1)) is None)
+
+        tilemap.set_tile(1, 1, self.tilesheet.tiles[5].copy())
+        assert(tilemap.passability.find_path((0, 1), (1, 1)) ==
+               [(0, 1), (1, 1)])
+        assert(len(tilemap.collision_group) == 4)